@@ -5,6 +5,7 @@ GUI for Checkers
 
 import os
 import sys
+import threading
 from typing import Union, Dict
 
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
@@ -13,7 +14,9 @@ import click
 
 from checkers import Square, Board, Checkers, Checkers_Piece
 
+from bitboard import BitboardCheckers
 from bot import Bot
+from mcts import MCTSBot
 from colorama import Fore, Style
 
 WIDTH = 800
@@ -23,6 +26,10 @@ WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GRAY = (122, 122, 122)
 BLUE = (0, 0, 255)
+# deepest search of a smart-bot given a time budget with --bot-time
+MAX_TIMED_DEPTH = 20
+# iterations per move of an mcts-bot without a time budget
+MCTS_ITERATIONS = 1000
 
 
 class GUIPlayer:
@@ -33,14 +40,24 @@ class GUIPlayer:
     """
 
     def __init__(
-        self, n: int, player_type: str, checkers: Checkers, color: str
+        self,
+        n: int,
+        player_type: str,
+        checkers: Checkers,
+        color: str,
+        bot_time: Union[float, None] = None,
+        bot_workers: int = 1,
     ):
         """Constructor
         Args:
             n: The player's number (1 or 2)
-            player_type: "human", "random-bot", or "smart-bot"
+            player_type: "human", "random-bot", "smart-bot" or "mcts-bot"
             checkers: The checkers game
             color: The player's color
+            bot_time: Seconds a smart-bot or mcts-bot may think per move,
+              or None for a fixed depth search (a fixed number of
+              iterations)
+            bot_workers: Number of processes a smart-bot searches on
         """
 
         if player_type == "human":
@@ -51,66 +68,198 @@ class GUIPlayer:
             self.bot = Bot(0, color)
         elif player_type == "smart-bot":
             self.name = f"Smart Bot {n}"
-            self.bot = Bot(2, color)
+            if bot_time is None:
+                self.bot = Bot(2, color, bitboard=True, workers=bot_workers)
+            else:
+                self.bot = Bot(
+                    MAX_TIMED_DEPTH,
+                    color,
+                    bitboard=True,
+                    time_limit=bot_time,
+                    workers=bot_workers,
+                )
+        elif player_type == "mcts-bot":
+            self.name = f"MCTS Bot {n}"
+            if bot_time is None:
+                self.bot = MCTSBot(color, iterations=MCTS_ITERATIONS)
+            else:
+                self.bot = MCTSBot(
+                    color, iterations=None, time_limit=bot_time
+                )
         self.checkers = checkers
         self.selected = None
+        self.jumping = False
 
 
-def draw_board(surface: pygame.surface.Surface, board_grid, all_moves) -> None:
-    """Draws the current state of the board in the window
-    Args:
-        surface: Pygame surface to draw the board on
-        board_grid: List of lists containing squares on board
-        all_moves: List of possible moves for individual pieces
+class BotWorker:
+    """
+    Searches for a bot's move on a background thread, so the window keeps
+    responding while the bot thinks. The bot searches on a BitboardCheckers
+    copy of the game, and the move is only played on the game itself by
+    the thread running the window, once the search is over.
+    """
+
+    def __init__(self, bot: Bot, checkers: Checkers):
+        """Constructor, starts the search
+        Args:
+            bot: The bot to get a move from
+            checkers: The game, which must not change until the search is
+              over
+        """
+        self.started = pygame.time.get_ticks()
+        self._move = None
+        self._error = None
+        position = BitboardCheckers.from_checkers(checkers)
+        # a daemon thread does not keep the program alive after a QUIT
+        self._thread = threading.Thread(
+            target=self._search, args=(bot, position), daemon=True
+        )
+        self._thread.start()
+
+    def _search(self, bot: Bot, position: BitboardCheckers) -> None:
+        """Runs on the background thread"""
+        try:
+            self._move = bot.get_move(position)
+        except Exception as error:
+            self._error = error
+
+    def done(self) -> bool:
+        """Returns whether the search is over"""
+        return not self._thread.is_alive()
+
+    def result(self):
+        """Returns the move found, or raises the error of the search"""
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._move
+
+
+class BoardRenderer:
+    """
+    Draws the board in a window, redrawing only what changed since the last
+    frame. Every kind of square (its color, piece and move hint) is drawn
+    once onto a small surface, which is then blitted wherever it is needed.
     """
-    grid = board_grid
-    nrows = len(grid)
-    ncols = len(grid[0])
-
-    surface.fill((0, 0, 255))
-
-    # Compute the row height and column width
-    rh = HEIGHT // nrows + 1
-    cw = WIDTH // ncols + 1
-
-    for row in range(nrows):
-        for col in range(ncols):
-            # Draw squares in the board
-            rect = (col * cw, row * rh, cw, rh)
-            square_col = (0, 255, 0)
-            if grid[row][col].color == "DARK":
-                square_col = BLACK
-            elif grid[row][col].color == "LIGHT":
-                square_col = RED
-            pygame.draw.rect(surface, color=square_col, rect=rect)
-
-            # Draw the circles for pieces
-            if grid[row][col].piece is None:
-                if grid[row][col].color == "LIGHT":
-                    circ_col = RED
-                elif grid[row][col].color == "DARK":
-                    circ_col = BLACK
-            elif grid[row][col].piece.color == "DARK":
-                circ_col = GRAY
-            elif grid[row][col].piece.color == "LIGHT":
-                circ_col = WHITE
-
-            center = (col * cw + cw // 2, row * rh + rh // 2)
-            radius = rh // 2 - 8
+
+    def __init__(self, nrows: int, ncols: int):
+        """Constructor
+        Args:
+            nrows: Number of rows of the board
+            ncols: Number of columns of the board
+        """
+        # Compute the row height and column width
+        self.rh = HEIGHT // nrows + 1
+        self.cw = WIDTH // ncols + 1
+        self._cells = {}
+        # what is on screen in every square, None if it must be redrawn
+        self._drawn = [[None] * ncols for _ in range(nrows)]
+        self._font = None
+        self._message = None
+        self._message_rect = None
+
+    def _cell(self, key) -> pygame.surface.Surface:
+        """Returns the surface of a kind of square, drawing it the first time
+        Args:
+            key: Tuple of the square color, piece color (or None), whether
+              the piece is a king and whether the square has a move hint
+        """
+        cell = self._cells.get(key)
+        if cell is not None:
+            return cell
+        square_color, piece_color, king, hint = key
+        cell = pygame.Surface((self.cw, self.rh))
+        square_col = (0, 255, 0)
+        if square_color == "DARK":
+            square_col = BLACK
+        elif square_color == "LIGHT":
+            square_col = RED
+        cell.fill(square_col)
+        center = (self.cw // 2, self.rh // 2)
+        radius = self.rh // 2 - 8
+        # Draw the circles for pieces
+        if piece_color is not None:
+            circ_col = GRAY if piece_color == "DARK" else WHITE
             pygame.draw.circle(
-                surface, color=circ_col, center=center, radius=radius
+                cell, color=circ_col, center=center, radius=radius
             )
-            if grid[row][col].piece is not None and grid[row][col].piece.king:
+            if king:
                 pygame.draw.circle(
-                    surface, color=BLACK, center=center, radius=radius / 2
+                    cell, color=BLACK, center=center, radius=radius / 2
                 )
-    # Draw dots for possible moves
-    if all_moves is not None:
-        for loc in all_moves:
-            center = (loc[1] * cw + cw // 2, loc[0] * rh + rh // 2)
+        # Draw dots for possible moves
+        if hint:
             pygame.draw.circle(
-                surface, color=BLUE, center=center, radius=radius / 2
+                cell, color=BLUE, center=center, radius=radius / 2
             )
+        self._cells[key] = cell
+        return cell
+
+    def draw(
+        self,
+        surface: pygame.surface.Surface,
+        board_grid,
+        hints,
+        message: Union[str, None] = None,
+    ) -> list:
+        """Draws the squares that changed since the last call
+        Args:
+            surface: Pygame surface to draw the board on
+            board_grid: List of lists containing squares on board
+            hints: List of squares to mark as possible moves, or None
+            message: Text to show over the top of the board, or None
+        Returns: list of the pygame.Rect areas that were drawn, to pass to
+          pygame.display.update
+        """
+        hint_set = set(hints) if hints else set()
+        # squares under a message that changed are drawn again
+        if message != self._message and self._message_rect is not None:
+            self._forget(self._message_rect)
+        dirty = []
+        for row, sq_lst in enumerate(board_grid):
+            for col, sq in enumerate(sq_lst):
+                piece = sq.piece
+                hint = (row, col) in hint_set
+                if piece is None:
+                    key = (sq.color, None, False, hint)
+                else:
+                    key = (sq.color, piece.color, piece.king, hint)
+                if self._drawn[row][col] != key:
+                    self._drawn[row][col] = key
+                    rect = surface.blit(
+                        self._cell(key), (col * self.cw, row * self.rh)
+                    )
+                    dirty.append(rect)
+        if message is not None and (
+            message != self._message
+            or self._message_rect.collidelist(dirty) != -1
+        ):
+            self._message_rect = self._draw_message(surface, message)
+            dirty.append(self._message_rect)
+        elif message is None:
+            self._message_rect = None
+        self._message = message
+        return dirty
+
+    def _forget(self, rect: pygame.Rect) -> None:
+        """Marks the squares under an area to be drawn again"""
+        last_row = min(rect.bottom // self.rh, len(self._drawn) - 1)
+        last_col = min(rect.right // self.cw, len(self._drawn[0]) - 1)
+        for row in range(rect.top // self.rh, last_row + 1):
+            for col in range(rect.left // self.cw, last_col + 1):
+                self._drawn[row][col] = None
+
+    def _draw_message(
+        self, surface: pygame.surface.Surface, message: str
+    ) -> pygame.Rect:
+        """Draws a message over the top left corner of the board"""
+        if self._font is None:
+            self._font = pygame.font.Font(None, 36)
+        text = self._font.render(message, True, WHITE)
+        background = pygame.Rect(0, 0, text.get_width() + 20, 40)
+        pygame.draw.rect(surface, color=GRAY, rect=background)
+        surface.blit(text, (10, 20 - text.get_height() // 2))
+        return background
 
 
 def process_click(pos, checkers, players, current_col):
@@ -122,6 +271,8 @@ def process_click(pos, checkers, players, current_col):
         players: dict[str, GUIPlayer]
         current_col: str, the current player turn
     Returns:
+        Tuple(bool, list or None): whether the turn is over, and the
+          squares to highlight
     """
     x, y = pos
     grid = checkers.board.board_grid
@@ -129,53 +280,56 @@ def process_click(pos, checkers, players, current_col):
     col = x // (WIDTH // length)
     row = y // (HEIGHT // length)
     player = players[current_col]
-    # If piece is clicked, highlight possible moves
-    if (
-        grid[row][col].piece is not None
-        and grid[row][col].piece.color == current_col
-    ):
-        king = grid[row][col].piece.king
-        all_moves = checkers.piece_all_moves((row, col), current_col, king)
-        player.selected = (row, col)
-        return (False, all_moves)
-
-    # Move a piece to a possible square
-    elif player.selected is not None:
-        selected_row, selected_col = player.selected
-        king = grid[selected_row][selected_col].piece.king
-        possible_moves = checkers.piece_all_moves(
-            player.selected,
-            current_col,
-            king,
-        )
-        move_permit = False
-        # Check is possible moves includes a capture
-        if (row, col, "NC") in possible_moves:
-            capture = "NC"
-            p_capture = False
-            move_permit = True
-        elif (row, col, "C") in possible_moves:
-            capture = "C"
-            p_capture = True
-            move_permit = True
-
-        # Actually move the piece
-        if move_permit:
+    # Moves are whole multi-jumps, played one jump per click. In the middle
+    # of one, only the piece that is jumping may move.
+    if player.jumping:
+        piece_moves = [
+            move
+            for move in checkers.legal_moves(current_col)
+            if move.start == player.selected
+        ]
+    else:
+        piece_moves = [
+            move
+            for move in checkers.legal_moves(current_col)
+            if move.start == (row, col)
+        ]
+        # If piece is clicked, highlight possible moves
+        if piece_moves:
+            player.selected = (row, col)
+            return (False, [move.path[0] for move in piece_moves])
+        if player.selected is None:
+            return (False, None)
+        piece_moves = [
+            move
+            for move in checkers.legal_moves(current_col)
+            if move.start == player.selected
+        ]
+
+    # Move the piece one jump to a possible square
+    for move in piece_moves:
+        if move.path[0] == (row, col):
+            king = checkers.is_king(player.selected)
             result = checkers.move_piece(
-                player.selected, (row, col, capture), current_col, king
+                player.selected, move.targets()[0], current_col, king
             )
-            if result == "Move Not Legal":
-                player.selected = None
-                return (False, None)
-            elif result == "Move Piece Again":
+            if result == "Move Piece Again":
                 player.selected = (row, col)
-                p_capture = True
-                return (False, None)
-            p_capture = False
+                player.jumping = True
+                return (
+                    False,
+                    [
+                        move.path[1]
+                        for move in piece_moves
+                        if move.path[0] == (row, col)
+                    ],
+                )
             player.selected = None
-            return (True, None)
-        player.selected = None
-        return (False, None)
+            player.jumping = False
+            return (result != "Move Not Legal", None)
+    if player.jumping:
+        return (False, [move.path[0] for move in piece_moves])
+    player.selected = None
     return (False, None)
 
 
@@ -191,6 +345,9 @@ def play_checkers(
         bot_delay: When playing as a bot, an artificial delay
           (in seconds) to wait before making a move.
     Returns: None
+
+    Bots search on a background thread while the window keeps drawing and
+    handling events.
     """
     board = checkers.board.board_grid
 
@@ -198,10 +355,12 @@ def play_checkers(
     pygame.init()
     pygame.display.set_caption("Checkers")
     surface = pygame.display.set_mode((WIDTH, HEIGHT))
+    renderer = BoardRenderer(len(board), len(board[0]))
     clock = pygame.time.Clock()
     all_moves = []
     no_winner = True
     current_col = "LIGHT"
+    worker = None
 
     while no_winner:
         events = pygame.event.get()
@@ -213,6 +372,9 @@ def play_checkers(
         for event in events:
             # If user closes window, exit the game
             if event.type == pygame.QUIT:
+                for player in players.values():
+                    if player.bot is not None:
+                        player.bot.close()
                 pygame.quit()
                 sys.exit()
             # Process mouse input
@@ -224,11 +386,22 @@ def play_checkers(
                     pygame.mouse.get_pos(), checkers, players, current_col
                 )
 
-        # Make a move through the bot
-        if players[current_col].bot is not None:
-            pygame.time.wait(int(bot_delay * 1000))
-            players[current_col].bot.move(checkers)
-            moved = True
+        # Make a move through the bot, once it has finished searching and
+        # the delay has passed
+        if players[current_col].bot is not None and no_winner:
+            if worker is None:
+                worker = BotWorker(players[current_col].bot, checkers)
+            elif (
+                worker.done()
+                and pygame.time.get_ticks() - worker.started
+                >= bot_delay * 1000
+            ):
+                # a move the live game refuses (or no move at all) does not
+                # end the turn, the bot searches again instead
+                move = worker.result()
+                worker = None
+                if move is not None and checkers.make_move(move) is not None:
+                    moved = True
 
         # Change the turn if a move was made
         if moved:
@@ -237,9 +410,14 @@ def play_checkers(
             elif current_col == "LIGHT":
                 current_col = "DARK"
 
-        # Update the display
-        draw_board(surface, board, all_moves)
-        pygame.display.update()
+        # Update the parts of the display that changed
+        message = None
+        if worker is not None:
+            dots = "." * (pygame.time.get_ticks() // 400 % 3 + 1)
+            message = f"{players[current_col].name} is thinking{dots}"
+        dirty = renderer.draw(surface, board, all_moves, message)
+        if dirty:
+            pygame.display.update(dirty)
         clock.tick(24)
 
     # Display winner on the terminal
@@ -259,25 +437,32 @@ def play_checkers(
 @click.option(
     "--player1",
     type=click.Choice(
-        ["human", "random-bot", "smart-bot"], case_sensitive=False
+        ["human", "random-bot", "smart-bot", "mcts-bot"],
+        case_sensitive=False,
     ),
     default="human",
 )
 @click.option(
     "--player2",
     type=click.Choice(
-        ["human", "random-bot", "smart-bot"], case_sensitive=False
+        ["human", "random-bot", "smart-bot", "mcts-bot"],
+        case_sensitive=False,
     ),
     default="human",
 )
 @click.option("-n", "--board-size", type=click.INT, default=3)
 @click.option("--bot-delay", type=click.FLOAT, default=0.5)
+@click.option("--bot-time", type=click.FLOAT, default=None)
+@click.option("--bot-workers", type=click.INT, default=1)
+@click.option("-v", "--verbose", count=True)
 
 # Run the GUI for checkers
-def cmd(player1, player2, board_size, bot_delay):
-    new_checkers = Checkers(board_size)
-    p1 = GUIPlayer(1, player1, new_checkers, "LIGHT")
-    p2 = GUIPlayer(2, player2, new_checkers, "DARK")
+def cmd(
+    player1, player2, board_size, bot_delay, bot_time, bot_workers, verbose
+):
+    new_checkers = Checkers(board_size, verbosity=verbose)
+    p1 = GUIPlayer(1, player1, new_checkers, "LIGHT", bot_time, bot_workers)
+    p2 = GUIPlayer(2, player2, new_checkers, "DARK", bot_time, bot_workers)
     players = {"LIGHT": p1, "DARK": p2}
     play_checkers(new_checkers, bot_delay, players)
 
@@ -0,0 +1,547 @@
+"""
+Benchmarks for the checkers engines and bots
+
+Run from the root of the repository, for example:
+
+    python3 src/benchmark.py ordering --depth 4
+    python3 src/benchmark.py pvs --depth 8
+    python3 src/benchmark.py perft --depth 6
+    python3 src/benchmark.py compare
+    python3 src/benchmark.py movegen
+    python3 src/benchmark.py snapshot
+    python3 src/benchmark.py memory
+"""
+import copy
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+
+import click
+
+from bitboard import BitboardCheckers
+from bot import Bot
+from checkers import Checkers, clear_board
+from evaluation import EVALUATORS
+
+# positions for perft: the n of the board and whose turn it is, plus a
+# diagram of the board (row 0 first) or None for the starting position.
+# "l" and "d" are light and dark men, "L" and "D" kings.
+PERFT_POSITIONS = {
+    "start-6x6": (2, "LIGHT", None),
+    "start-8x8": (3, "LIGHT", None),
+    "start-10x10": (4, "LIGHT", None),
+    "multijump-8x8": (
+        3,
+        "LIGHT",
+        (
+            "........",
+            "..l.....",
+            "...d.d..",
+            "........",
+            "...d.d..",
+            "........",
+            ".d.d....",
+            "L.......",
+        ),
+    ),
+    "kings-8x8": (
+        3,
+        "DARK",
+        (
+            ".l...l..",
+            "..D.....",
+            ".l.L....",
+            "....d...",
+            ".d...l..",
+            "......D.",
+            ".d.d....",
+            "......d.",
+        ),
+    ),
+}
+
+# known-good perft counts, the number of positions after every sequence of
+# 1, 2, ... whole moves (a multi-jump is one move). The starting 8x8 counts
+# are the published perft counts of English draughts.
+PERFT_COUNTS = {
+    "start-6x6": [5, 25, 106, 369, 1271, 4104, 12495, 37474, 104013],
+    "start-8x8": [7, 49, 302, 1469, 7361, 36768, 179740],
+    "start-10x10": [9, 81, 658, 4265, 26875, 164406],
+    "multijump-8x8": [5, 17, 35, 187, 661, 3436, 12210, 63382, 252307],
+    "kings-8x8": [1, 1, 1, 1, 7, 26, 139, 484, 2839, 10226, 61391],
+}
+
+
+def random_positions(play_len, count, seed=0, plies=10, bitboard=True):
+    """
+    Creates positions to benchmark on by playing random moves from the
+    starting position.
+
+    Input:
+    - play_len(int): the number of starting rows per player
+    - count(int): how many positions to create
+    - seed(int): seed of the random moves
+    - plies(int): the most random moves played per position
+    - bitboard(bool): create BitboardCheckers games instead of Checkers
+
+    Output:
+    - list(Checkers or BitboardCheckers)
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        if bitboard:
+            game = BitboardCheckers(play_len)
+        else:
+            game = Checkers(play_len)
+        for _ in range(rng.randint(0, plies)):
+            moves = game.legal_moves(game.board.turn)
+            if not moves:
+                break
+            game.make_move_unchecked(rng.choice(sorted(moves)))
+        if game.all_moves(game.board.turn):
+            positions.append(game)
+    return positions
+
+
+def perft_position(name, bitboard=False):
+    """
+    Creates a game in one of the PERFT_POSITIONS.
+
+    Input:
+    - name(str): key of PERFT_POSITIONS
+    - bitboard(bool): create a BitboardCheckers game instead of Checkers
+
+    Output:
+    - Checkers or BitboardCheckers
+    """
+    play_len, turn, diagram = PERFT_POSITIONS[name]
+    if diagram is None:
+        game = Checkers(play_len)
+    else:
+        game = clear_board(play_len)
+        pieces = {
+            "l": ("LIGHT", False),
+            "L": ("LIGHT", True),
+            "d": ("DARK", False),
+            "D": ("DARK", True),
+        }
+        for row, line in enumerate(diagram):
+            for col, char in enumerate(line):
+                if char in pieces:
+                    game._place_piece((row, col), *pieces[char])
+    game.board.turn = turn
+    if bitboard:
+        return BitboardCheckers.from_checkers(game)
+    return game
+
+
+def perft(game, depth):
+    """
+    Counts the positions reached by every sequence of depth whole moves
+    from the current position of a game.
+
+    Input:
+    - game(Checkers or BitboardCheckers): the position to start from, left
+        unchanged
+    - depth(int): number of moves
+
+    Output:
+    - int
+    """
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in game.legal_moves(game.board.turn):
+        records = game.make_move_unchecked(move)
+        nodes += perft(game, depth - 1)
+        game.unmake_move(records)
+    return nodes
+
+
+def compare_engines(play_len, games, seed=0):
+    """
+    Plays random games on a Checkers and a BitboardCheckers game side by
+    side and checks that both give the same moves, in the same order, after
+    every move.
+
+    Input:
+    - play_len(int): the number of starting rows per player
+    - games(int): how many games to play
+    - seed(int): seed of the random moves
+
+    Output:
+    - tuple(
+        int, -> positions compared
+        list(str) -> the FEN of every position where the engines differ
+        )
+    """
+    rng = random.Random(seed)
+    positions = 0
+    differ = []
+    for _ in range(games):
+        game = Checkers(play_len)
+        bitboard = BitboardCheckers(play_len)
+        while True:
+            positions += 1
+            turn = game.board.turn
+            moves = game.legal_moves(turn)
+            same = moves == bitboard.legal_moves(turn)
+            for color in ("LIGHT", "DARK"):
+                same = same and list(game.all_moves(color).items()) == list(
+                    bitboard.all_moves(color).items()
+                )
+            if not same:
+                differ.append(game.to_fen())
+            if not moves or game.moves_since_capture >= 40:
+                break
+            move = rng.choice(moves)
+            game.make_move_unchecked(move)
+            bitboard.make_move_unchecked(move)
+    return positions, differ
+
+
+def movegen_speed(game, depth, totals):
+    """
+    Walks the perft tree of a game and times all_moves, piece_all_moves and
+    apply_move (the move of move_piece, taken back with undo_move) at every
+    position, as they are called during a search, and make_move and
+    make_move_unchecked (taken back with unmake_move) for every legal move.
+
+    Input:
+    - game(Checkers or BitboardCheckers): the position to start from, left
+        unchanged
+    - depth(int): number of moves
+    - totals(dict): maps each function name to [moves, seconds], added to
+
+    Output:
+    - None
+    """
+    turn = game.board.turn
+    start = time.perf_counter()
+    moves = game.all_moves(turn)
+    totals["all_moves"][1] += time.perf_counter() - start
+    totals["all_moves"][0] += sum(len(m) for m in moves.values())
+    for piece in moves:
+        king = game.is_king(piece)
+        start = time.perf_counter()
+        piece_moves = game.piece_all_moves(piece, turn, king)
+        totals["piece_all_moves"][1] += time.perf_counter() - start
+        totals["piece_all_moves"][0] += len(piece_moves)
+    for piece, targets in moves.items():
+        for target in targets:
+            start = time.perf_counter()
+            record = game.apply_move(piece, target, turn, game.is_king(piece))
+            game.undo_move(record)
+            totals["move_piece"][1] += time.perf_counter() - start
+            totals["move_piece"][0] += 1
+    legal = game.legal_moves(turn)
+    for name in ("make_move", "make_move_unchecked"):
+        make = getattr(game, name)
+        start = time.perf_counter()
+        for move in legal:
+            game.unmake_move(make(move))
+        totals[name][1] += time.perf_counter() - start
+        totals[name][0] += len(legal)
+    if depth == 0:
+        return
+    for move in legal:
+        records = game.make_move_unchecked(move)
+        movegen_speed(game, depth - 1, totals)
+        game.unmake_move(records)
+
+
+@click.group(name="checkers-bench")
+def bench():
+    """
+    Benchmarks for the checkers engines and bots
+    """
+
+
+@bench.command(name="ordering")
+@click.option("--depth", type=click.INT, default=4)
+@click.option("-n", "--positions", type=click.INT, default=10)
+@click.option("--play_len", type=click.INT, default=3)
+@click.option("--seed", type=click.INT, default=0)
+@click.option("--tt/--no-tt", default=False)
+def ordering(depth, positions, play_len, seed, tt):
+    """
+    Compares the nodes minimax visits with and without move ordering at the
+    same depth, and checks both searches find the same value.
+    """
+    totals = {False: [0, 0.0], True: [0, 0.0]}
+    print("position  unordered    ordered  ratio  same value")
+    for i, game in enumerate(random_positions(play_len, positions, seed)):
+        maxing = game.board.turn == "LIGHT"
+        evals = {}
+        nodes = {}
+        for order in (False, True):
+            bot = Bot(
+                depth,
+                game.board.turn,
+                tt_mb=16 if tt else 0,
+                ordering=order,
+            )
+            start = time.time()
+            evals[order], _ = bot.minimax(
+                game, depth, maxing, -float("inf"), float("inf")
+            )
+            nodes[order] = bot.nodes
+            totals[order][0] += bot.nodes
+            totals[order][1] += time.time() - start
+        print(
+            f"{i:8d} {nodes[False]:10d} {nodes[True]:10d} "
+            f"{nodes[True] / nodes[False]:6.2f}  {evals[False] == evals[True]}"
+        )
+    print(
+        f"total    {totals[False][0]:10d} {totals[True][0]:10d} "
+        f"{totals[True][0] / totals[False][0]:6.2f}"
+    )
+    print(
+        f"time (s) {totals[False][1]:10.3f} {totals[True][1]:10.3f} "
+        f"{totals[True][1] / totals[False][1]:6.2f}"
+    )
+
+
+@bench.command(name="pvs")
+@click.option("--depth", type=click.INT, default=8)
+@click.option("-n", "--positions", type=click.INT, default=20)
+@click.option("--play_len", type=click.INT, default=3)
+@click.option("--seed", type=click.INT, default=0)
+@click.option(
+    "--eval", "eval_name", type=click.Choice(sorted(EVALUATORS)),
+    default="positional",
+)
+@click.option("--deepening", is_flag=True, default=False)
+def pvs(depth, positions, play_len, seed, eval_name, deepening):
+    """
+    Compares the nodes minimax and PVS visit at the same depth, and checks
+    both searches find the same value. With --deepening both search depth
+    1, 2, ... as bots with a time limit do, PVS with aspiration windows.
+    """
+    totals = {False: [0, 0.0], True: [0, 0.0]}
+    same = 0
+    print("position    minimax        pvs  ratio  same value")
+    for i, game in enumerate(random_positions(play_len, positions, seed)):
+        game.set_evaluator(EVALUATORS[eval_name]())
+        maxing = game.board.turn == "LIGHT"
+        evals = {}
+        nodes = {}
+        for use_pvs in (False, True):
+            bot = Bot(depth, game.board.turn, pvs=use_pvs)
+            start = time.time()
+            if deepening:
+                evals[use_pvs], _ = bot.iterative_deepening(game, maxing)
+            else:
+                evals[use_pvs], _ = bot.root_search(game, depth, maxing)
+            nodes[use_pvs] = bot.nodes
+            totals[use_pvs][0] += bot.nodes
+            totals[use_pvs][1] += time.time() - start
+        same += evals[False] == evals[True]
+        print(
+            f"{i:8d} {nodes[False]:10d} {nodes[True]:10d} "
+            f"{nodes[True] / nodes[False]:6.2f}  {evals[False] == evals[True]}"
+        )
+    print(
+        f"total    {totals[False][0]:10d} {totals[True][0]:10d} "
+        f"{totals[True][0] / totals[False][0]:6.2f}  {same}/{positions}"
+    )
+    print(
+        f"time (s) {totals[False][1]:10.3f} {totals[True][1]:10.3f} "
+        f"{totals[True][1] / totals[False][1]:6.2f}"
+    )
+
+
+@bench.command(name="perft")
+@click.option("--depth", type=click.INT, default=5)
+@click.option(
+    "-p",
+    "--position",
+    "names",
+    type=click.Choice(sorted(PERFT_POSITIONS)),
+    multiple=True,
+)
+@click.option("--bitboard", is_flag=True, default=False)
+def perft_cmd(depth, names, bitboard):
+    """
+    Counts the positions reached after every sequence of 1 to depth moves
+    and checks them against the known-good counts. Exits with status 1 if a
+    count is wrong.
+    """
+    wrong = 0
+    print("position          depth        nodes   time (s)    nodes/s  check")
+    for name in names or PERFT_POSITIONS:
+        game = perft_position(name, bitboard)
+        known = PERFT_COUNTS[name]
+        for d in range(1, depth + 1):
+            start = time.perf_counter()
+            nodes = perft(game, d)
+            seconds = time.perf_counter() - start
+            if d > len(known):
+                check = "-"
+            elif known[d - 1] == nodes:
+                check = "ok"
+            else:
+                check = f"WRONG, expected {known[d - 1]}"
+                wrong += 1
+            print(
+                f"{name:16s} {d:6d} {nodes:12d} {seconds:10.3f} "
+                f"{nodes / seconds:10.0f}  {check}"
+            )
+    if wrong:
+        sys.exit(1)
+
+
+@bench.command(name="compare")
+@click.option("-n", "--games", type=click.INT, default=50)
+@click.option(
+    "--play_len", "sizes", type=click.INT, multiple=True, default=(2, 3, 4)
+)
+@click.option("--seed", type=click.INT, default=0)
+def compare(games, sizes, seed):
+    """
+    Checks that Checkers and BitboardCheckers give the same all_moves and
+    legal_moves, in the same order, over random games. Exits with status 1
+    if they differ anywhere.
+    """
+    wrong = 0
+    print("board   positions  differ")
+    for play_len in sizes:
+        positions, differ = compare_engines(play_len, games, seed)
+        side = 2 * play_len + 2
+        print(f"{side:2d}x{side:<2d} {positions:11d} {len(differ):7d}")
+        for fen in differ[:5]:
+            print(f"  {fen}")
+        wrong += len(differ)
+    if wrong:
+        sys.exit(1)
+
+
+@bench.command(name="movegen")
+@click.option("--depth", type=click.INT, default=3)
+@click.option(
+    "--play_len", "sizes", type=click.INT, multiple=True, default=(2, 3, 4)
+)
+@click.option("--bitboard", is_flag=True, default=False)
+def movegen(depth, sizes, bitboard):
+    """
+    Reports how many moves per second all_moves and piece_all_moves generate
+    and how many moves per second apply_move, make_move and
+    make_move_unchecked play and undo, over the perft tree of the starting
+    position of every board size.
+    """
+    print("board  function                moves   time (s)    moves/s")
+    for play_len in sizes:
+        side = 2 * play_len + 2
+        if bitboard:
+            game = BitboardCheckers(play_len)
+        else:
+            game = Checkers(play_len)
+        totals = {
+            "all_moves": [0, 0.0],
+            "piece_all_moves": [0, 0.0],
+            "move_piece": [0, 0.0],
+            "make_move": [0, 0.0],
+            "make_move_unchecked": [0, 0.0],
+        }
+        movegen_speed(game, depth, totals)
+        for name, (moves, seconds) in totals.items():
+            print(
+                f"{side:2d}x{side:<2d}  {name:19s} {moves:9d} "
+                f"{seconds:10.3f} {moves / seconds:10.0f}"
+            )
+
+
+@bench.command(name="snapshot")
+@click.option("-n", "--positions", type=click.INT, default=20)
+@click.option("--play_len", type=click.INT, default=3)
+@click.option("--seed", type=click.INT, default=0)
+def snapshot(positions, play_len, seed):
+    """
+    Compares how long it takes to copy a game with deepcopy and pickle and
+    with the text and binary formats of position.py, for both engines.
+    """
+    print("engine     method              time (us)   size (bytes)")
+    for bitboard in (False, True):
+        games = random_positions(play_len, positions, seed, bitboard=bitboard)
+        cls = type(games[0])
+        methods = {
+            "deepcopy": (copy.deepcopy, None),
+            "pickle": (
+                lambda game: pickle.loads(pickle.dumps(game)),
+                pickle.dumps,
+            ),
+            "to_fen/from_fen": (
+                lambda game: cls.from_fen(game.to_fen(), game.evaluator),
+                lambda game: game.to_fen().encode(),
+            ),
+            "to_bytes/from_bytes": (
+                lambda game: cls.from_bytes(game.to_bytes(), game.evaluator),
+                lambda game: game.to_bytes(),
+            ),
+            "copy": (lambda game: game.copy(), None),
+        }
+        for name, (clone, dump) in methods.items():
+            start = time.perf_counter()
+            for game in games:
+                clone(game)
+            seconds = time.perf_counter() - start
+            size = "-"
+            if dump is not None:
+                size = f"{sum(len(dump(g)) for g in games) / len(games):.0f}"
+            print(
+                f"{cls.__name__[:9]:10s} {name:19s} "
+                f"{1e6 * seconds / len(games):9.1f} {size:>14s}"
+            )
+
+
+@bench.command(name="memory")
+@click.option("-n", "--games", type=click.INT, default=100)
+@click.option(
+    "--play_len", "sizes", type=click.INT, multiple=True, default=(3, 5, 9)
+)
+@click.option("--plies", type=click.INT, default=200)
+def memory(games, sizes, plies):
+    """
+    Reports the memory a Checkers game takes and how long creating one
+    takes for every board size, then how many bytes are allocated while
+    random moves are played and taken back.
+    """
+    print("board     bytes/game   create (us)   bytes/move")
+    for play_len in sizes:
+        side = 2 * play_len + 2
+        tracemalloc.start()
+        start = time.perf_counter()
+        boards = [Checkers(play_len) for _ in range(games)]
+        seconds = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        rng = random.Random(0)
+        game = boards[0]
+        del boards
+        tracemalloc.start()
+        allocated = 0
+        moves = 0
+        for _ in range(plies):
+            legal = game.legal_moves(game.board.turn)
+            if not legal:
+                break
+            move = rng.choice(sorted(legal))
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            records = game.make_move(move)
+            allocated += tracemalloc.get_traced_memory()[1] - before
+            game.unmake_move(records)
+            game.make_move(move)
+            moves += 1
+        tracemalloc.stop()
+        print(
+            f"{side:3d}x{side:<3d} {size / games:12.0f} "
+            f"{1e6 * seconds / games:13.1f} {allocated / max(moves, 1):12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    bench()
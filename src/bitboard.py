@@ -0,0 +1,1036 @@
+"""
+Bitboard version of the Checkers game logic in checkers.py
+
+The board is stored as three integers used as bitmasks: one for the squares
+holding light pieces, one for the squares holding dark pieces and one for the
+squares holding kings. Square (row, column) is bit row * (side_len + 1) +
+column. The extra column on every row is never a playable square, so shifting
+a mask along a diagonal can never wrap a piece from one edge of the board to
+the other.
+
+BitboardCheckers produces the same moves as Checkers and can be used by Bot
+wherever a Checkers game is expected:
+
+x = BitboardCheckers()
+#Creates a new checkers board with n = 3
+x.all_moves("LIGHT")
+# Returns the same dictionary as Checkers().all_moves("LIGHT")
+x.move_piece((2,1),(3,2,'NC'), "LIGHT")
+# Moves the piece at (2,1) to (3,2).
+y = BitboardCheckers.from_checkers(Checkers())
+# Converts a Checkers game into a BitboardCheckers game
+y.to_checkers()
+# Converts it back
+z = BitboardCheckers.from_bytes(Checkers().to_bytes())
+# Positions move between both classes in the formats of position.py
+"""
+import copy
+
+from colorama import Fore
+
+import checkers
+import position
+from checkers import PIECES, Checkers, Move, TerminalRenderer
+from evaluation import DEFAULT_EVALUATOR
+from transposition import TURN_KEY, zobrist_keys
+
+
+def _shift(mask, step):
+    """
+    Shifts every bit of a mask by step squares (negative steps move bits
+    towards row 0).
+
+    Returns int
+    """
+    if step > 0:
+        return mask << step
+    return mask >> -step
+
+
+_VALID_MASKS = {}
+
+
+def _valid_mask(rows, columns):
+    """
+    Returns the mask of the dark squares of a board, built once per size.
+
+    Returns int
+    """
+    valid = _VALID_MASKS.get((rows, columns))
+    if valid is None:
+        valid = 0
+        for i in range(rows):
+            for j in range(columns):
+                if (i + j) % 2 == 1:
+                    valid |= 1 << (i * (columns + 1) + j)
+        _VALID_MASKS[(rows, columns)] = valid
+    return valid
+
+
+_COORDS = {}
+
+
+def _coords_table(rows, columns):
+    """
+    Returns the coordinates of the square of every bit of a board, by bit
+    index, built once per size.
+
+    Returns list[tuple(int, int)]
+    """
+    table = _COORDS.get((rows, columns))
+    if table is None:
+        table = [divmod(i, columns + 1) for i in range(rows * (columns + 1))]
+        _COORDS[(rows, columns)] = table
+    return table
+
+
+class BitBoard:
+    """
+    Bitmask representation of a board, mirroring the Board class.
+
+    Attributes:
+    rows (int): number of rows on the board
+    columns (int): number of columns on the board
+    width (int): number of bits used per row (columns + 1)
+    light (int): mask of the squares holding light pieces
+    dark (int): mask of the squares holding dark pieces
+    kings (int): mask of the squares holding kings (of either color)
+    valid (int): mask of the dark squares, the only ones pieces can be on
+    turn (str): Color of the current turn's player
+    winner (None or str): color of winner (str), "DRAW" if draw, None if no winner
+    white_draw_offer (bool): whether or not white offers a draw
+    black_draw_offer (bool): whether or not black offers a draw
+    """
+
+    def __init__(self, row, column, turn="LIGHT"):
+        """
+        Constructor
+
+        Parameters:
+            rows (int): number of rows on the board
+            columns (int): number of columns on the board
+            turn (str): color of current player's turn
+
+        Initializes an empty board with set side length.
+        """
+        self.rows = row
+        self.columns = column
+        self.width = column + 1
+        self.light = 0
+        self.dark = 0
+        self.kings = 0
+        self.valid = _valid_mask(row, column)
+        self.turn = turn
+        self.white_draw_offer = False
+        self.black_draw_offer = False
+        self.winner = None
+
+    def bit(self, loc):
+        """
+        Returns the mask with only the bit of the square at loc set.
+
+        Parameters:
+            loc (tuple(int, int)): coordinates of the square
+
+        Returns: int
+        """
+        return 1 << (loc[0] * self.width + loc[1])
+
+    def coords(self, mask):
+        """
+        Returns the coordinates of the lowest square set in a mask.
+
+        Parameters:
+            mask (int): nonzero mask
+
+        Returns: tuple(int, int)
+        """
+        return divmod((mask & -mask).bit_length() - 1, self.width)
+
+    def __str__(self):
+        """
+        str method, draws the board the same way Board does.
+        """
+        brd_str = ""
+        brd_str += " ____" * self.rows
+        brd_str += "\n"
+        for i in range(self.rows):
+            brd_str += "|"
+            for j in range(self.columns):
+                bit = self.bit((i, j))
+                if bit & self.valid:
+                    sq = Fore.BLACK + "X" + Fore.RESET
+                else:
+                    sq = " "
+                if bit & self.light:
+                    p = str(PIECES["LIGHT", bool(bit & self.kings)])
+                elif bit & self.dark:
+                    p = str(PIECES["DARK", bool(bit & self.kings)])
+                else:
+                    p = " "
+                brd_str += f"{sq} {p} |"
+            brd_str += "\n"
+            brd_str += "|"
+            brd_str += "____|" * self.rows
+            brd_str += "\n"
+        return brd_str
+
+
+class BitboardCheckers:
+    """
+    Game logic of checkers played on a BitBoard. Has the same interface as
+    Checkers for everything the bots use.
+    """
+
+    def __init__(self, n=3, verbosity=0, evaluator=None):
+        """
+        Constructor
+
+        Args:
+        board (BitBoard): board used for the game
+        side_len (int): length of board
+        moves_since_capture (int): moves since capture
+        zobrist (int): Zobrist hash of the pieces on the board
+        evaluator (Evaluator): scores the pieces for calculate_boardstate
+        score (int): sum of the evaluator's values of all pieces on the board
+        listeners (list[callable]): functions called with every GameEvent
+
+        Parameters:
+            n: int (number of starting rows with pieces for each player)
+            verbosity: int (0 is silent, 1 prints messages about moves, 2
+            also prints the board after every move)
+            evaluator: Evaluator or None (None uses material only)
+
+        Initializes a checkers board with the starting pieces.
+        """
+        self.listeners = []
+        if verbosity > 0:
+            self.subscribe(TerminalRenderer(self, verbosity))
+        self._setup(2 * n + 2, evaluator)
+        for i in range(self.side_len):
+            for j in range(self.side_len):
+                bit = self.board.bit((i, j))
+                if not bit & self.board.valid:
+                    continue
+                if i < n:
+                    self.board.light |= bit
+                    self.zobrist ^= self._zobrist_key((i, j), "LIGHT", False)
+                    self.score += self._value((i, j), "LIGHT", False)
+                elif self.side_len - n - 1 < i:
+                    self.board.dark |= bit
+                    self.zobrist ^= self._zobrist_key((i, j), "DARK", False)
+                    self.score += self._value((i, j), "DARK", False)
+
+    def _setup(self, side_len, evaluator):
+        """
+        Sets up an empty board of a given side length.
+
+        Parameters:
+            side_len (int): length of the board
+            evaluator (Evaluator or None): None uses material only
+
+        Returns: None
+        """
+        self.side_len = side_len
+        self.moves_since_capture = 0
+        self.zobrist = 0
+        self._zobrist_keys = zobrist_keys(self.side_len)
+        self.evaluator = evaluator or DEFAULT_EVALUATOR
+        self._values = self.evaluator.table(self.side_len)
+        self.score = 0
+        self.board = BitBoard(self.side_len, self.side_len)
+        width = self.board.width
+        # diagonal steps as bit offsets, (forward, backward) for each color
+        down = (width + 1, width - 1)
+        up = (-(width - 1), -(width + 1))
+        self._steps = {"LIGHT": (down, up), "DARK": (up, down)}
+        self._coords = _coords_table(self.side_len, self.side_len)
+        # result of check_winner and the winner it sets, for the board in
+        # _status_key
+        self._status = None
+        self._status_key = None
+
+    @classmethod
+    def from_checkers(cls, game):
+        """
+        Builds a BitboardCheckers game in the same position as a Checkers
+        game.
+
+        Parameters:
+            game (Checkers): the game to convert
+
+        Returns: BitboardCheckers
+        """
+        bit_game = cls((game.side_len - 2) // 2, evaluator=game.evaluator)
+        brd = bit_game.board
+        brd.light = brd.dark = brd.kings = 0
+        for row, col in game.board.pieces_white_set:
+            brd.light |= brd.bit((row, col))
+        for row, col in game.board.pieces_black_set:
+            brd.dark |= brd.bit((row, col))
+        pieces = game.board.pieces_white_set | game.board.pieces_black_set
+        for row, col in pieces:
+            if game.board.board_grid[row][col].piece.king:
+                brd.kings |= brd.bit((row, col))
+        brd.turn = game.board.turn
+        brd.winner = game.board.winner
+        brd.white_draw_offer = game.board.white_draw_offer
+        brd.black_draw_offer = game.board.black_draw_offer
+        bit_game.moves_since_capture = game.moves_since_capture
+        bit_game.zobrist = game.zobrist
+        bit_game.score = game.score
+        return bit_game
+
+    def to_checkers(self):
+        """
+        Builds a Checkers game in the same position as this game.
+
+        Returns: Checkers
+        """
+        brd = self.board
+        game = Checkers((self.side_len - 2) // 2, evaluator=self.evaluator)
+        pieces = game.board.pieces_white_set | game.board.pieces_black_set
+        for loc in list(pieces):
+            game._remove_piece(loc)
+        for color, mask in (("LIGHT", brd.light), ("DARK", brd.dark)):
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                game._place_piece(
+                    brd.coords(bit), color, bool(bit & brd.kings)
+                )
+        game.board.turn = brd.turn
+        game.board.winner = brd.winner
+        game.board.white_draw_offer = brd.white_draw_offer
+        game.board.black_draw_offer = brd.black_draw_offer
+        game.moves_since_capture = self.moves_since_capture
+        return game
+
+    def get_position(self):
+        """
+        Returns everything needed to set up the game in its current position.
+
+        Returns: Position
+        """
+        brd = self.board
+        squares = []
+        for mask in (brd.light, brd.dark, brd.kings):
+            locs = []
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                locs.append(brd.coords(bit))
+            squares.append(locs)
+        return position.Position(
+            self.side_len,
+            tuple(squares[0]),
+            tuple(squares[1]),
+            frozenset(squares[2]),
+            brd.turn,
+            self.moves_since_capture,
+            brd.white_draw_offer,
+            brd.black_draw_offer,
+        )
+
+    @classmethod
+    def from_position(cls, pos, evaluator=None):
+        """
+        Builds a game in a given position.
+
+        Parameters:
+            pos (Position): the position
+            evaluator (Evaluator or None): None uses material only
+
+        Returns: BitboardCheckers
+        """
+        # skips __init__, which would place the starting pieces
+        game = cls.__new__(cls)
+        game.listeners = []
+        game._setup(pos.side_len, evaluator)
+        brd = game.board
+        for color, pieces in (("LIGHT", pos.light), ("DARK", pos.dark)):
+            for loc in pieces:
+                king = loc in pos.kings
+                bit = brd.bit(loc)
+                if color == "LIGHT":
+                    brd.light |= bit
+                else:
+                    brd.dark |= bit
+                if king:
+                    brd.kings |= bit
+                game.zobrist ^= game._zobrist_key(loc, color, king)
+                game.score += game._value(loc, color, king)
+        brd.turn = pos.turn
+        brd.white_draw_offer = pos.white_draw_offer
+        brd.black_draw_offer = pos.black_draw_offer
+        game.moves_since_capture = pos.moves_since_capture
+        return game
+
+    def to_fen(self):
+        """
+        Returns the position in the text format of position.py.
+
+        Returns: str
+        """
+        return Checkers.to_fen(self)
+
+    @classmethod
+    def from_fen(cls, text, evaluator=None):
+        """
+        Builds a game from a position in the text format of position.py.
+
+        Returns: BitboardCheckers
+        """
+        return cls.from_position(position.from_text(text), evaluator)
+
+    def to_bytes(self):
+        """
+        Returns the position in the binary format of position.py.
+
+        Returns: bytes
+        """
+        return Checkers.to_bytes(self)
+
+    @classmethod
+    def from_bytes(cls, data, evaluator=None):
+        """
+        Builds a game from a position in the binary format of position.py.
+
+        Returns: BitboardCheckers
+        """
+        return cls.from_position(position.from_bytes(data), evaluator)
+
+    def copy(self):
+        """
+        Returns a copy of the game in the same position, with the same
+        evaluator and winner but no listeners. The board is only a few
+        integers, so this copies it directly instead of going through a
+        Position.
+
+        Returns: BitboardCheckers
+        """
+        game = copy.copy(self)
+        game.listeners = []
+        game.board = copy.copy(self.board)
+        return game
+
+    def __str__(self):
+        """
+        str method, returns str
+        """
+        return str(self.board)
+
+    def zobrist_key(self):
+        """
+        Returns the Zobrist hash of the position, including whose turn it is.
+
+        Returns: int
+        """
+        if self.board.turn == "DARK":
+            return self.zobrist ^ TURN_KEY
+        return self.zobrist
+
+    def _zobrist_key(self, loc, color, king):
+        """
+        Returns the Zobrist key of a piece of a given color and king state on
+        the square at loc.
+
+        Returns: int
+        """
+        return self._zobrist_keys[(color, king)][
+            loc[0] * self.side_len + loc[1]
+        ]
+
+    def _value(self, loc, color, king):
+        """
+        Returns the evaluator's value of a piece of a given color and king
+        state on the square at loc.
+
+        Returns: int
+        """
+        return self._values[(color, king)][loc[0] * self.side_len + loc[1]]
+
+    def set_evaluator(self, evaluator):
+        """
+        Scores the game with a different evaluator from now on, summing its
+        values of the pieces already on the board.
+
+        Parameters:
+            evaluator (Evaluator): the new evaluator
+
+        Returns: None
+        """
+        brd = self.board
+        self.evaluator = evaluator
+        self._values = evaluator.table(self.side_len)
+        self.score = 0
+        for color, mask in (("LIGHT", brd.light), ("DARK", brd.dark)):
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                self.score += self._value(
+                    brd.coords(bit), color, bool(bit & brd.kings)
+                )
+
+    def is_king(self, loc):
+        """
+        Returns whether the piece at loc is a king.
+
+        Parameters:
+            loc (tuple(int, int)): coordinates of the piece
+
+        Returns: bool
+        """
+        return bool(self.board.kings & self.board.bit(loc))
+
+    def _sides(self, color):
+        """
+        Returns the masks of the pieces of color and of its opponent.
+
+        Returns: tuple(int, int)
+        """
+        if color == "LIGHT":
+            return self.board.light, self.board.dark
+        return self.board.dark, self.board.light
+
+    def _moves_from(self, own, opp, color, capture=False):
+        """
+        Generates the moves of every piece in the mask own, with the capture
+        rule applied to all of them together.
+
+        Parameters:
+            own (int): mask of the pieces to generate moves for
+            opp (int): mask of the opponent's pieces
+            color (str): color of the pieces
+            capture (bool): generate only capture moves
+
+        Returns: dict{'tuple(int, int)': list[tuple(int, int, str)]}
+        """
+        brd = self.board
+        empty = brd.valid & ~(brd.light | brd.dark)
+        fwd, back = self._steps[color]
+        kings = own & brd.kings
+        movers = (
+            (fwd[0], own),
+            (fwd[1], own),
+            (back[0], kings),
+            (back[1], kings),
+        )
+        moves = {}
+        for step, mask in movers:
+            land = _shift(_shift(mask, step) & opp, step) & empty
+            while land:
+                bit = land & -land
+                land ^= bit
+                src = brd.coords(_shift(bit, -2 * step))
+                moves.setdefault(src, []).append(brd.coords(bit) + ("C",))
+        if moves or capture:
+            return moves
+        for step, mask in movers:
+            land = _shift(mask, step) & empty
+            while land:
+                bit = land & -land
+                land ^= bit
+                src = brd.coords(_shift(bit, -step))
+                moves.setdefault(src, []).append(brd.coords(bit) + ("NC",))
+        return moves
+
+    def all_moves(self, color_move):
+        """
+        Returns a dictionary of all possible moves on the board, the same one
+        Checkers.all_moves returns for the same position, in the same order
+        (pieces and their moves by square).
+
+        Parameters:
+        color_move (str): color of the player
+
+        Returns: dict{'tuple(int, int)': list[tuple(int, int, str)]}
+        """
+        own, opp = self._sides(color_move)
+        moves = self._moves_from(own, opp, color_move)
+        return {src: sorted(moves[src]) for src in sorted(moves)}
+
+    def legal_moves(self, color_move):
+        """
+        Returns every move a player can make on their turn, with each
+        multi-jump as a single Move, like Checkers.legal_moves and in the
+        same order. The moves are found on the masks: the pieces that can
+        capture are found all at once, and their jump sequences without
+        playing them.
+
+        Parameters:
+        color_move (str): color of the player, who must be on turn
+
+        Returns: list[Move]
+        """
+        brd = self.board
+        own, opp = self._sides(color_move)
+        empty = brd.valid & ~(brd.light | brd.dark)
+        fwd, back = self._steps[color_move]
+        kings = own & brd.kings
+        coords = self._coords
+        movers = (
+            (fwd[0], own),
+            (fwd[1], own),
+            (back[0], kings),
+            (back[1], kings),
+        )
+        capturers = 0
+        for step, mask in movers:
+            capturers |= _shift(_shift(empty, -step) & opp, -step) & mask
+        moves = []
+        if capturers:
+            while capturers:
+                bit = capturers & -capturers
+                capturers ^= bit
+                self._add_jumps(
+                    coords[bit.bit_length() - 1],
+                    bit,
+                    fwd + back if bit & kings else fwd,
+                    opp,
+                    empty | bit,
+                    [],
+                    [],
+                    moves,
+                )
+            return moves
+        steps = []
+        for step, mask in movers:
+            land = _shift(mask, step) & empty
+            while land:
+                bit = land & -land
+                land ^= bit
+                steps.append(
+                    (_shift(bit, -step).bit_length(), bit.bit_length())
+                )
+        steps.sort()
+        return [
+            Move(coords[src - 1], (coords[dst - 1],), ())
+            for src, dst in steps
+        ]
+
+    def _add_jumps(
+        self, start, bit, steps, opp, empty, path, captured, moves
+    ):
+        """
+        Adds to moves every capture sequence of the piece that started at
+        start and is now on bit, the way Checkers._add_chains finds them:
+        captured pieces leave the board at once, and the piece keeps the
+        directions it started with, so a man that is promoted stops.
+
+        Parameters:
+        start (tuple(int, int)): where the piece started its turn
+        bit (int): mask of the square the piece is on
+        steps (tuple(int)): the directions the piece moves in
+        opp (int): mask of the opponent's pieces not captured yet
+        empty (int): mask of the empty squares, counting the square the
+        piece is on, as it leaves that square with its next jump
+        path (list[tuple(int, int)]): squares the piece has jumped to so far
+        captured (list[tuple(int, int)]): squares captured so far
+        moves (list[Move]): the list the finished sequences are added to
+
+        Returns: None
+        """
+        jumps = []
+        for step in steps:
+            mid = _shift(bit, step) & opp
+            if mid:
+                land = _shift(mid, step) & empty
+                if land:
+                    jumps.append((land, mid))
+        if not jumps:
+            moves.append(Move(start, tuple(path), tuple(captured)))
+            return
+        jumps.sort()
+        coords = self._coords
+        for land, mid in jumps:
+            path.append(coords[land.bit_length() - 1])
+            captured.append(coords[mid.bit_length() - 1])
+            self._add_jumps(
+                start,
+                land,
+                steps,
+                opp ^ mid,
+                empty | mid,
+                path,
+                captured,
+                moves,
+            )
+            path.pop()
+            captured.pop()
+
+    def make_move(self, move):
+        """
+        Plays a Move from legal_moves jump by jump. Returns the records to
+        pass to unmake_move, or None if the move is not legal.
+        """
+        return Checkers.make_move(self, move)
+
+    def make_move_unchecked(self, move):
+        """
+        Plays a Move from legal_moves without checking that it is legal.
+        Returns the records to pass to unmake_move.
+
+        With no listeners the whole move is played on the masks at once;
+        listeners hear about every jump, so the move is then played jump
+        by jump like Checkers.make_move_unchecked.
+        """
+        if self.listeners:
+            return Checkers.make_move_unchecked(self, move)
+        if checkers.DEBUG_MOVES:
+            assert move in self.legal_moves(self.board.turn), (
+                f"illegal move {move}"
+            )
+        brd = self.board
+        record = (
+            brd.light,
+            brd.dark,
+            brd.kings,
+            brd.turn,
+            self.moves_since_capture,
+            brd.winner,
+            self.zobrist,
+            self.score,
+        )
+        color = brd.turn
+        side = self.side_len
+        keys = self._zobrist_keys
+        values = self._values
+        width = brd.width
+        start = move.start
+        end = move.path[-1]
+        src = 1 << (start[0] * width + start[1])
+        dst = 1 << (end[0] * width + end[1])
+        was_king = bool(brd.kings & src)
+        to_king = was_king or end[0] == 0 or end[0] == brd.rows - 1
+        i = start[0] * side + start[1]
+        j = end[0] * side + end[1]
+        self.zobrist ^= keys[(color, was_king)][i] ^ keys[(color, to_king)][j]
+        self.score += (
+            values[(color, to_king)][j] - values[(color, was_king)][i]
+        )
+        kings = brd.kings & ~src
+        if to_king:
+            kings |= dst
+        if color == "LIGHT":
+            brd.light = brd.light & ~src | dst
+            opp_color = "DARK"
+        else:
+            brd.dark = brd.dark & ~src | dst
+            opp_color = "LIGHT"
+        if move.captured:
+            gone = 0
+            for loc in move.captured:
+                bit = 1 << (loc[0] * width + loc[1])
+                king = bool(brd.kings & bit)
+                k = loc[0] * side + loc[1]
+                self.zobrist ^= keys[(opp_color, king)][k]
+                self.score -= values[(opp_color, king)][k]
+                gone |= bit
+            brd.light &= ~gone
+            brd.dark &= ~gone
+            kings &= ~gone
+            self.moves_since_capture = 0
+        else:
+            self.moves_since_capture += 1
+        brd.kings = kings
+        brd.turn = opp_color
+        return [record + (start, end, color, "End Turn")]
+
+    def unmake_move(self, records):
+        """
+        Takes back a move played with make_move. With no listeners to hear
+        about every jump, the position before the move is restored at once
+        from the first record.
+        """
+        if self.listeners:
+            Checkers.unmake_move(self, records)
+            return
+        brd = self.board
+        (
+            brd.light,
+            brd.dark,
+            brd.kings,
+            brd.turn,
+            self.moves_since_capture,
+            brd.winner,
+            self.zobrist,
+            self.score,
+        ) = records[0][:8]
+
+    def piece_all_moves(
+        self,
+        piece_loc,
+        p_color,
+        king=False,
+        capture=False,
+    ) -> list:
+        """
+        Given a piece location, returns a list of coords of possible moves,
+        the same list Checkers.piece_all_moves returns: the moves of each
+        direction are only its captures if the piece can capture that way,
+        and a king's backward moves come before its forward ones.
+
+        Parameters:
+        piece (tuple(int, int)): coordinates of the piece to be moved
+        p_color (str): color of the player
+        king (bool): if selected piece is a king
+        capture (bool): display only capture moves
+
+        Returns: list[tuple(int, int, str)]
+        """
+        brd = self.board
+        _, opp = self._sides(p_color)
+        bit = brd.bit(piece_loc)
+        empty = brd.valid & ~(brd.light | brd.dark)
+        fwd, back = self._steps[p_color]
+        lst_moves = []
+        jumps = []
+        for step in back if king else fwd:
+            dest = _shift(bit, step)
+            if dest & empty:
+                if not capture:
+                    lst_moves.append(brd.coords(dest) + ("NC",))
+            elif dest & opp:
+                land = _shift(dest, step) & empty
+                if land:
+                    jumps.append(brd.coords(land) + ("C",))
+        if jumps:
+            lst_moves = jumps
+        lst_moves.sort()
+        if king:
+            return lst_moves + self.piece_all_moves(
+                piece_loc,
+                p_color,
+                False,
+            )
+        return lst_moves
+
+    def check_winner(self):
+        """
+        Checks the current board to see if there is a winner.
+
+        Parameters: (None)
+
+        The status is kept with the masks and moves since capture it was
+        found for, so calling this again on the same board costs nothing.
+
+        Returns: str ("Black Wins" or "White Wins" or "No Winner")
+        """
+        brd = self.board
+        key = (brd.light, brd.dark, brd.kings, self.moves_since_capture)
+        if key != self._status_key:
+            if len(self.all_moves("LIGHT")) == 0:
+                self._status = ("Black Wins", "DARK")
+            elif len(self.all_moves("DARK")) == 0:
+                self._status = ("White Wins", "LIGHT")
+            elif self.moves_since_capture == 40:
+                self._status = ("DRAW", "DRAW")
+            else:
+                self._status = ("No Winner", None)
+            self._status_key = key
+        result, winner = self._status
+        if winner is not None:
+            brd.winner = winner
+        return result
+
+    def resign(self, color_player):
+        """
+        Player color resigns, setting board.winner to the color of the opposite
+        player. Returns color of the winner.
+        """
+        return Checkers.resign(self, color_player)
+
+    def draw_offer(self, color_player):
+        """
+        Player color offers/accepts a draw. Returns "DRAW" and sets
+        board.winner state to draw if both players accept.
+        """
+        return Checkers.draw_offer(self, color_player)
+
+    def undo_draw_offer(self):
+        """
+        Sets the draw offer for both players to False.
+        """
+        Checkers.undo_draw_offer(self)
+
+    def subscribe(self, listener):
+        """
+        Calls listener with a GameEvent for every move, capture, promotion,
+        end of turn, illegal move and undo from now on.
+        """
+        Checkers.subscribe(self, listener)
+
+    def unsubscribe(self, listener):
+        """
+        Stops calling a listener added with subscribe.
+        """
+        Checkers.unsubscribe(self, listener)
+
+    def muted(self):
+        """
+        Context manager that detaches all listeners while it is open.
+        """
+        return Checkers.muted(self)
+
+    def _emit(self, kind, color, start=None, end=None):
+        """
+        Calls every listener with a new GameEvent.
+        """
+        Checkers._emit(self, kind, color, start, end)
+
+    def move_piece(
+        self, piece_loc, board_loc, color_p, king=False, capture=False
+    ):
+        """
+        Given the coordinates of a piece and the coordinates of a square on the
+        board, moves the piece to the square. Returns a message about the move.
+
+        Parameters: same as Checkers.move_piece
+
+        Returns: str
+        """
+        record = self.apply_move(piece_loc, board_loc, color_p, king, capture)
+        if record is None:
+            return "Move Not Legal"
+        return record[-1]
+
+    def apply_move(
+        self, piece_loc, board_loc, color_p, king=False, capture=False
+    ):
+        """
+        Moves a piece like move_piece, but returns a record that can be passed
+        to undo_move to take the move back.
+
+        Parameters: same as Checkers.move_piece
+
+        Returns: tuple, or None if the move is not legal
+        """
+        brd = self.board
+        if (
+            color_p != brd.turn
+            or tuple(board_loc)
+            not in self.all_moves(color_p).get(tuple(piece_loc), [])
+            or (capture and board_loc[2] != "C")
+        ):
+            if self.listeners:
+                self._emit("illegal", color_p, piece_loc, board_loc)
+            return None
+        return self._apply(piece_loc, board_loc, color_p, king)
+
+    def _apply(self, piece_loc, board_loc, color_p, king, again=None):
+        """
+        Moves a piece without checking that the move is legal, like
+        Checkers._apply.
+
+        Parameters:
+            piece_loc, board_loc, color_p: same as apply_move
+            king (bool): unused, the board knows which pieces are kings
+            again (None or bool): whether the piece has to move again after
+            the move, looked up from its moves if None
+
+        Returns: tuple
+        """
+        brd = self.board
+        record = (
+            brd.light,
+            brd.dark,
+            brd.kings,
+            brd.turn,
+            self.moves_since_capture,
+            brd.winner,
+            self.zobrist,
+            self.score,
+        )
+        src = brd.bit(piece_loc)
+        dst = brd.bit(board_loc)
+        was_king = bool(brd.kings & src)
+        if color_p == "LIGHT":
+            brd.light ^= src | dst
+            opp_color = "DARK"
+        else:
+            brd.dark ^= src | dst
+            opp_color = "LIGHT"
+        brd.kings &= ~src
+        if was_king:
+            brd.kings |= dst
+        self.moves_since_capture += 1
+        result = "End Turn"
+        self.zobrist ^= self._zobrist_key(piece_loc, color_p, was_king)
+        self.score -= self._value(piece_loc, color_p, was_king)
+        if board_loc[2] == "C":
+            cap_loc = (
+                (piece_loc[0] + board_loc[0]) // 2,
+                (piece_loc[1] + board_loc[1]) // 2,
+            )
+            mid = ~brd.bit(cap_loc)
+            cap_king = bool(brd.kings & ~mid)
+            self.zobrist ^= self._zobrist_key(cap_loc, opp_color, cap_king)
+            self.score -= self._value(cap_loc, opp_color, cap_king)
+            brd.light &= mid
+            brd.dark &= mid
+            brd.kings &= mid
+            self.moves_since_capture = 0
+            if again is None:
+                _, opp = self._sides(color_p)
+                # the piece keeps its king state from before the move here
+                again = bool(self._moves_from(dst, opp, color_p, True))
+            if again:
+                result = "Move Piece Again"
+        if board_loc[0] == 0 or board_loc[0] == brd.rows - 1:
+            brd.kings |= dst
+        to_king = bool(brd.kings & dst)
+        self.zobrist ^= self._zobrist_key(board_loc, color_p, to_king)
+        self.score += self._value(board_loc, color_p, to_king)
+        if result == "End Turn":
+            brd.turn = opp_color
+        start = (piece_loc[0], piece_loc[1])
+        end = (board_loc[0], board_loc[1])
+        if self.listeners:
+            self._emit("move", color_p, start, end)
+            if board_loc[2] == "C":
+                self._emit("capture", color_p, cap_loc)
+            if not was_king and to_king:
+                self._emit("promotion", color_p, end)
+            if result == "End Turn":
+                self._emit("end_turn", color_p)
+            else:
+                self._emit("move_again", color_p, end)
+        return record + (start, end, color_p, result)
+
+    def undo_move(self, record):
+        """
+        Takes back a move made with apply_move.
+
+        Parameters:
+        record (tuple): the record returned by apply_move
+
+        Returns: None
+        """
+        brd = self.board
+        (
+            brd.light,
+            brd.dark,
+            brd.kings,
+            brd.turn,
+            self.moves_since_capture,
+            brd.winner,
+            self.zobrist,
+            self.score,
+        ) = record[:8]
+        if self.listeners:
+            self._emit("undo", record[10], record[8], record[9])
+
+    def calculate_boardstate(self):
+        """
+        Calculates the boardstate used for bot implementation
+
+        The pieces' values are kept as a running total in self.score, which
+        apply_move updates and undo_move restores.
+        """
+        winner = self.board.winner
+        if winner == "LIGHT":
+            return self.score + self.evaluator.WIN
+        elif winner == "DARK":
+            return self.score - self.evaluator.WIN
+        return self.score
@@ -4,10 +4,28 @@
 #       - provided pseudocode for the minimax algorithm
 import numpy as np
 from checkers import *
+from bitboard import BitboardCheckers
+from evaluation import EVALUATORS
+from mcts import MCTSBot
+from records import GameWriter
+from stats import SearchStats
+from transposition import (
+    EXACT,
+    LOWER,
+    UPPER,
+    TranspositionTable,
+)
+import io
 import random
-from copy import deepcopy
 import time
 import click
+from multiprocessing import Pool, Value
+
+
+class _SearchTimeout(Exception):
+    """
+    Raised inside minimax when the bot's time budget for a move runs out.
+    """
 
 
 class Bot:
@@ -18,33 +36,111 @@ class Bot:
     or algorithmically optimized moves through the minimax algorithm
     """
 
-    def __init__(self, depth, color):
+    def __init__(
+        self,
+        depth,
+        color,
+        bitboard=False,
+        tt_mb=16,
+        time_limit=None,
+        ordering=True,
+        workers=1,
+        evaluator=None,
+        quiescence=0,
+        pvs=False,
+    ):
         """
         Constructor
         Attributes:
         depth (int): how many layers of the minimax tree will this bot go
         color(str): either "LIGHT" or "DARK"
         random(bool): if the bot is random or not
+        bitboard(bool): if the bot searches on a BitboardCheckers copy of the
+        game
+        tt(TranspositionTable or None): search results kept between moves
+        time_limit(None or float): seconds the bot may spend on a move
+        ordering(bool): if the bot orders moves before searching them
+        nodes(int): number of positions visited by minimax so far
+        stats(None or SearchStats): statistics of the search in progress,
+        while get_move collects them
+        workers(int): number of processes the bot searches on
+        evaluator(None or Evaluator): scores the positions the bot searches
+        quiescence(int): most positions searched past each leaf, 0 if the
+        bot does not search past its depth
+        pvs(bool): if the bot searches with negamax instead of minimax
 
         Parameters:
         depth(int): how many layers of minimax the bot will run through, 0 or
         less will be a random bot
         color(str): which side the bot will play on
+        bitboard(bool): search on a BitboardCheckers copy of Checkers games,
+        which gives the same moves much faster
+        tt_mb(float): memory cap in megabytes of the transposition table, 0
+        turns the table off
+        time_limit(None or float): if given, the bot searches one layer deeper
+        at a time until time_limit seconds have passed (or depth is reached)
+        and plays the move of the deepest search that finished
+        ordering(bool): search the most promising moves first (the stored or
+        previous best move, then captures and promotions, then killer moves,
+        then moves by history score); False searches them in legal_moves
+        order
+        workers(int): if more than 1, the moves of the root position are split
+        over a pool of that many processes, which is kept for the bot's later
+        moves until close is called
+        evaluator(None or Evaluator): evaluator from evaluation.py the bot
+        scores positions with, None uses the game's own evaluator
+        quiescence(int): if more than 0, a leaf of the search where the
+        player to move has to capture is not scored as it is, but searched
+        on through captures only until no capture is pending, visiting at
+        most this many positions per leaf
+        pvs(bool): search with principal variation search (see negamax),
+        which finds the same values as minimax visiting fewer positions,
+        and with a time_limit search every depth in an aspiration window
+        around the value of the previous one
 
         Initializes empty bot
         """
         assert color == "LIGHT" or color == "DARK"
         self.depth = depth
         self.color = color
+        self.bitboard = bitboard
         self.random = False
         if depth <= 0:
             self.random = True
+        self.tt = None
+        if not self.random and tt_mb > 0:
+            self.tt = TranspositionTable(tt_mb)
+        self.time_limit = time_limit
+        self._deadline = None
+        self.ordering = ordering
+        self.nodes = 0
+        # quiet moves that caused a cutoff, two per ply
+        self._killers = []
+        # how often and how deep a quiet move caused a cutoff
+        self._history = {}
+        self.workers = workers
+        self._pool = None
+        self._bound = None
+        self._searches = 0
+        self._tt_mb = tt_mb
+        self.evaluator = evaluator
+        self.quiescence = quiescence
+        self.pvs = pvs
+        # statistics of the search in progress, if get_move collects them
+        self.stats = None
+        self._depth_reached = 0
 
-    def minimax(self, game, depth, maxing, alpha, beta):
+    def minimax(
+        self, game, depth, maxing, alpha, beta, first_move=None, ply=0
+    ):
         """
         This is the algorithm for sorting through possible checkers gamestates
         at a given depth and choosing the optimal move based on a minimax
-        algorithm with alpha-beta pruning.
+        algorithm with alpha-beta pruning. Every child is searched on the same
+        game object by applying the move and undoing it afterwards, so the game
+        is left exactly as it was passed in. Results are stored in the bot's
+        transposition table and reused when a position comes up again. A
+        multi-jump is a single move, so every move passes the turn.
         Inputs:
         - game(Checkers obj): the current boardstate
         - depth(int): the depth to which the algorithm should search possible
@@ -53,72 +149,412 @@ class Bot:
         or minimizing(DARK) side
         - alpha(float or int): the alpha used in alpha-beta pruning
         - beta(float or int): the beta used in alpha-beta pruning
+        - first_move(None or Move): a move to search before all others
+        - ply(int): how many moves deep into the search game is
 
         Output:
         - tuple(
             int,
-            tuple(tuple(int,int), tuple(int, int, str))
+            Move
             )
         """
+        self.nodes += 1
+        stats = self.stats
+        # captures pending at the horizon are searched on
+        if depth == 0 and self.quiescence > 0 and game.board.winner is None:
+            budget = [self.quiescence]
+            return self.quiesce(game, maxing, alpha, beta, budget), ""
         # base case
         if depth == 0 or game.board.winner is not None:
-            return game.calculate_boardstate(), ""
-        # white
+            if stats is None:
+                return game.calculate_boardstate(), ""
+            start = time.perf_counter()
+            eval = game.calculate_boardstate()
+            stats.eval_time += time.perf_counter() - start
+            stats.leaves += 1
+            return eval, ""
+        if self._deadline is not None and time.time() > self._deadline:
+            raise _SearchTimeout
+        # positions already searched deep enough
+        tt_move = None
+        if self.tt is not None:
+            key = game.zobrist_key()
+            entry = self.tt.probe(key)
+            if entry is not None:
+                tt_depth, tt_eval, flag, tt_move = entry
+                if tt_depth >= depth and (
+                    flag == EXACT
+                    or (flag == LOWER and tt_eval >= beta)
+                    or (flag == UPPER and tt_eval <= alpha)
+                ):
+                    return tt_eval, tt_move
+        alpha_orig = alpha
+        beta_orig = beta
         if maxing:
+            # white
             color = "LIGHT"
-            max_eval = np.NINF
-            best_move = None
-            w_all = game.all_moves(color)
-            for piece_coord, moves in w_all.items():
-                p_x, p_y = piece_coord
-                is_king = game.board.board_grid[p_x][p_y].piece.king
-                if len(moves) == 0:
-                    continue
-                for move_coord in moves:
-                    if move_coord is None or move_coord == ():
-                        continue
-                    tmp_board = deepcopy(game)
-                    tmp_board.move_piece(
-                        piece_coord, move_coord, color, king=is_king
-                    )
-                    eval, _ = self.minimax(
-                        tmp_board, depth - 1, False, alpha, beta
-                    )
-                    max_eval = max(eval, max_eval)
-                    if eval == max_eval:
-                        best_move = (piece_coord, move_coord)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    break
-            return max_eval, best_move
-        # black
+            best_eval = -np.inf
         else:
+            # black
             color = "DARK"
-            min_eval = np.inf
-            best_move = None
-            b_all = game.all_moves(color)
-            for piece_coord, moves in b_all.items():
-                p_x, p_y = piece_coord
-                is_king = game.board.board_grid[p_x][p_y].piece.king
-                if len(moves) == 0:
-                    continue
-                for move_coord in moves:
-                    if move_coord is None or move_coord == ():
-                        continue
-                    tmp_board = deepcopy(game)
-                    tmp_board.move_piece(
-                        piece_coord, move_coord, color, king=is_king
+            best_eval = np.inf
+        best_move = None
+        if first_move is None:
+            first_move = tt_move
+        if stats is None:
+            moves = game.legal_moves(color)
+        else:
+            start = time.perf_counter()
+            moves = game.legal_moves(color)
+            stats.movegen_time += time.perf_counter() - start
+            stats.expanded += 1
+            stats.children += len(moves)
+        for move in self._order_moves(game, moves, first_move, ply):
+            if stats is None:
+                records = game.make_move_unchecked(move)
+            else:
+                start = time.perf_counter()
+                records = game.make_move_unchecked(move)
+                stats.copy_time += time.perf_counter() - start
+            try:
+                eval, _ = self.minimax(
+                    game, depth - 1, not maxing, alpha, beta, ply=ply + 1
+                )
+            finally:
+                if stats is None:
+                    game.unmake_move(records)
+                else:
+                    start = time.perf_counter()
+                    game.unmake_move(records)
+                    stats.copy_time += time.perf_counter() - start
+            if maxing:
+                if best_move is None or eval > best_eval:
+                    best_eval = eval
+                    best_move = move
+                alpha = max(alpha, eval)
+            else:
+                if best_move is None or eval < best_eval:
+                    best_eval = eval
+                    best_move = move
+                beta = min(beta, eval)
+            if beta <= alpha:
+                if not move.captured:
+                    self._add_cutoff(move, depth, ply)
+                if stats is not None:
+                    stats.add_cutoff(ply)
+                break
+        if self.tt is not None:
+            if best_eval <= alpha_orig:
+                flag = UPPER
+            elif best_eval >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self.tt.store(key, depth, best_eval, flag, best_move)
+        return best_eval, best_move
+
+    def negamax(
+        self, game, depth, maxing, alpha, beta, first_move=None, ply=0
+    ):
+        """
+        The principal variation search (PVS) form of minimax, written as
+        negamax: values are from the point of view of the player to move,
+        so both players maximize and a child's value is the negative of its
+        own. The first (most promising) move is searched with the full
+        window. Every other move is only tested with a null window, which
+        proves cheaply that it is no better than the best so far, and is
+        searched again with the full window if the test fails high. The
+        values of the evaluators are whole numbers, so the null window is
+        (alpha, alpha + 1). Finds the same values as minimax, and shares
+        its transposition table, killer moves and quiescence search.
+
+        Inputs:
+        - game(Checkers or BitboardCheckers): the current boardstate, left
+        unchanged
+        - depth(int): the depth to which the algorithm should search possible
+        gamestates
+        - maxing(bool): whether the player to move is the maxing(LIGHT) side
+        - alpha(float or int): the alpha used in alpha-beta pruning, from
+        the point of view of the player to move
+        - beta(float or int): the beta used in alpha-beta pruning, from the
+        point of view of the player to move
+        - first_move(None or Move): a move to search before all others
+        - ply(int): how many moves deep into the search game is
+
+        Output:
+        - tuple(
+            int, -> the value for the player to move
+            Move
+            )
+        """
+        self.nodes += 1
+        stats = self.stats
+        sign = 1 if maxing else -1
+        # captures pending at the horizon are searched on
+        if depth == 0 and self.quiescence > 0 and game.board.winner is None:
+            budget = [self.quiescence]
+            if maxing:
+                return self.quiesce(game, True, alpha, beta, budget), ""
+            return -self.quiesce(game, False, -beta, -alpha, budget), ""
+        # base case
+        if depth == 0 or game.board.winner is not None:
+            if stats is None:
+                return sign * game.calculate_boardstate(), ""
+            start = time.perf_counter()
+            eval = game.calculate_boardstate()
+            stats.eval_time += time.perf_counter() - start
+            stats.leaves += 1
+            return sign * eval, ""
+        if self._deadline is not None and time.time() > self._deadline:
+            raise _SearchTimeout
+        # the table holds values from LIGHT's point of view, like minimax
+        tt_move = None
+        if self.tt is not None:
+            key = game.zobrist_key()
+            entry = self.tt.probe(key)
+            if entry is not None:
+                tt_depth, tt_eval, flag, tt_move = entry
+                if not maxing:
+                    tt_eval = -tt_eval
+                    flag = {LOWER: UPPER, UPPER: LOWER}.get(flag, flag)
+                if tt_depth >= depth and (
+                    flag == EXACT
+                    or (flag == LOWER and tt_eval >= beta)
+                    or (flag == UPPER and tt_eval <= alpha)
+                ):
+                    return tt_eval, tt_move
+        alpha_orig = alpha
+        color = "LIGHT" if maxing else "DARK"
+        best_eval = -np.inf
+        best_move = None
+        if first_move is None:
+            first_move = tt_move
+        if stats is None:
+            moves = game.legal_moves(color)
+        else:
+            start = time.perf_counter()
+            moves = game.legal_moves(color)
+            stats.movegen_time += time.perf_counter() - start
+            stats.expanded += 1
+            stats.children += len(moves)
+        for move in self._order_moves(game, moves, first_move, ply):
+            if stats is None:
+                records = game.make_move_unchecked(move)
+            else:
+                start = time.perf_counter()
+                records = game.make_move_unchecked(move)
+                stats.copy_time += time.perf_counter() - start
+            try:
+                if best_move is None:
+                    eval, _ = self.negamax(
+                        game, depth - 1, not maxing, -beta, -alpha,
+                        ply=ply + 1,
                     )
-                    eval, _ = self.minimax(
-                        tmp_board, depth - 1, True, alpha, beta
+                    eval = -eval
+                else:
+                    eval, _ = self.negamax(
+                        game, depth - 1, not maxing, -alpha - 1, -alpha,
+                        ply=ply + 1,
                     )
-                    min_eval = min(eval, min_eval)
-                    if eval == min_eval:
-                        best_move = (piece_coord, move_coord)
+                    eval = -eval
+                    if alpha < eval < beta:
+                        # the move may be better than the best so far
+                        if stats is not None:
+                            stats.researches += 1
+                        eval, _ = self.negamax(
+                            game, depth - 1, not maxing, -beta, -eval,
+                            ply=ply + 1,
+                        )
+                        eval = -eval
+            finally:
+                if stats is None:
+                    game.unmake_move(records)
+                else:
+                    start = time.perf_counter()
+                    game.unmake_move(records)
+                    stats.copy_time += time.perf_counter() - start
+            if best_move is None or eval > best_eval:
+                best_eval = eval
+                best_move = move
+            alpha = max(alpha, eval)
+            if beta <= alpha:
+                if not move.captured:
+                    self._add_cutoff(move, depth, ply)
+                if stats is not None:
+                    stats.add_cutoff(ply)
+                break
+        if self.tt is not None:
+            if best_eval <= alpha_orig:
+                flag = UPPER
+            elif best_eval >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            if not maxing:
+                flag = {LOWER: UPPER, UPPER: LOWER}.get(flag, flag)
+            self.tt.store(key, depth, sign * best_eval, flag, best_move)
+        return best_eval, best_move
+
+    def search(
+        self, game, depth, maxing, alpha, beta, first_move=None, ply=0
+    ):
+        """
+        Searches a position with minimax, or with negamax if the bot was made
+        with pvs, taking and returning values from LIGHT's point of view
+        either way.
+
+        Input: the same as minimax
+
+        Output:
+        - tuple(
+            int,
+            Move
+            )
+        """
+        if not self.pvs:
+            return self.minimax(
+                game, depth, maxing, alpha, beta, first_move, ply
+            )
+        if maxing:
+            return self.negamax(
+                game, depth, True, alpha, beta, first_move, ply
+            )
+        eval, move = self.negamax(
+            game, depth, False, -beta, -alpha, first_move, ply
+        )
+        return -eval, move
+
+    def quiesce(self, game, maxing, alpha, beta, budget):
+        """
+        Searches a leaf of minimax on through capture sequences, so that it
+        is not scored in the middle of an exchange. Captures are mandatory,
+        so a player who has to capture cannot stand pat: every capture is
+        searched. A position is scored as it is once its player to move has
+        no capture, or once the budget of positions runs out.
+
+        Input:
+        - game(Checkers or BitboardCheckers): the leaf, left unchanged
+        - maxing(bool): whether the player to move is the maxing(LIGHT) side
+        - alpha(float or int): the alpha used in alpha-beta pruning
+        - beta(float or int): the beta used in alpha-beta pruning
+        - budget(list[int]): positions left to visit from the leaf, shared
+        by the whole search of the leaf and counted down in place
+
+        Output:
+        - int: the value of the leaf
+        """
+        stats = self.stats
+        color = "LIGHT" if maxing else "DARK"
+        budget[0] -= 1
+        if stats is not None:
+            start = time.perf_counter()
+        targets = None
+        if budget[0] > 0 and game.board.winner is None:
+            # all_moves only has captures when a capture is pending
+            targets = next(iter(game.all_moves(color).values()), None)
+        if not targets or targets[0][2] != "C":
+            if stats is None:
+                return game.calculate_boardstate()
+            evaluated = time.perf_counter()
+            eval = game.calculate_boardstate()
+            stats.movegen_time += evaluated - start
+            stats.eval_time += time.perf_counter() - evaluated
+            stats.leaves += 1
+            return eval
+        moves = game.legal_moves(color)
+        if stats is not None:
+            stats.movegen_time += time.perf_counter() - start
+            stats.expanded += 1
+            stats.children += len(moves)
+        best_eval = -np.inf if maxing else np.inf
+        for move in self._order_moves(game, moves, None, 0):
+            self.nodes += 1
+            records = game.make_move_unchecked(move)
+            try:
+                eval = self.quiesce(game, not maxing, alpha, beta, budget)
+            finally:
+                game.unmake_move(records)
+            if maxing:
+                best_eval = max(best_eval, eval)
+                alpha = max(alpha, eval)
+            else:
+                best_eval = min(best_eval, eval)
                 beta = min(beta, eval)
-                if beta <= alpha:
-                    break
-            return min_eval, best_move
+            if beta <= alpha:
+                break
+        return best_eval
+
+    def _order_moves(self, game, moves, first_move, ply):
+        """
+        Sorts moves from legal_moves, most promising first: first_move, then
+        captures (the most captured pieces first) and moves onto the
+        promotion row (promotions, and the odd king move), then the killer
+        moves of this ply, then the other moves by history score. Without
+        ordering the moves keep legal_moves order.
+
+        Input:
+        - game(Checkers obj): the current boardstate
+        - moves(list(Move)): moves as returned by legal_moves
+        - first_move(None or Move): the move to put first
+        - ply(int): how many moves deep into the search game is
+
+        Output:
+        - list(Move)
+        """
+        if not self.ordering:
+            if first_move in moves:
+                moves.remove(first_move)
+                moves.insert(0, first_move)
+            return moves
+        if ply < len(self._killers):
+            killers = self._killers[ply]
+        else:
+            killers = ()
+        # everything is read off the moves, without looking at the board:
+        # captures are mandatory, so either all moves capture or none do
+        if moves and moves[0].captured:
+            moves.sort(
+                key=lambda move: (move == first_move, len(move.captured)),
+                reverse=True,
+            )
+            return moves
+        if game.board.turn == "LIGHT":
+            promotion_row = game.board.rows - 1
+        else:
+            promotion_row = 0
+        history = self._history
+
+        def score(move):
+            if move == first_move:
+                return (4, 0)
+            if move.path[-1][0] == promotion_row:
+                return (3, 0)
+            if move in killers:
+                return (2, 0)
+            return (1, history.get(move, 0))
+
+        moves.sort(key=score, reverse=True)
+        return moves
+
+    def _add_cutoff(self, move, depth, ply):
+        """
+        Records a quiet move that caused an alpha-beta cutoff as a killer
+        move of its ply and raises its history score.
+
+        Input:
+        - move(Move): the move that caused the cutoff
+        - depth(int): the remaining depth the move was searched at
+        - ply(int): how many moves deep into the search the move was made
+        """
+        if not self.ordering:
+            return
+        while len(self._killers) <= ply:
+            self._killers.append([None, None])
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self._history[move] = self._history.get(move, 0) + depth * depth
 
     def random_move(self, game, seed=None):
         """
@@ -129,35 +565,58 @@ class Bot:
         - seed(int): a seed to regularize the bot for testing purposes
 
         Output:
-        - tuple(
-            tuple(int,int),
-            tuple(int,int,str)
-            )
+        - Move
         """
         if seed is not None:
             random.seed(seed)
-        poss_moves = game.all_moves(self.color)
+        poss_moves = {}
+        for move in game.legal_moves(self.color):
+            poss_moves.setdefault(move.start, []).append(move)
         random_idx = random.randint(0, len(poss_moves) - 1)
-        random_piece = list(poss_moves.keys())[random_idx]
-        random_piece_moves = poss_moves[random_piece]
+        # sorted so that a seed picks the same move in every process
+        random_piece = sorted(poss_moves.keys())[random_idx]
+        random_piece_moves = sorted(poss_moves[random_piece])
         random_piece_idx = random.randint(0, len(random_piece_moves) - 1)
-        random_move = (random_piece, random_piece_moves[random_piece_idx])
-        return random_move
+        return random_piece_moves[random_piece_idx]
 
-    def get_move(self, new_board_state):
+    def get_move(self, new_board_state, stats=False):
         """
         gets a move recommendation based on board state
 
         Input:
-        - new_board_state(Checkers): the game to get a move from
+        - new_board_state(Checkers or BitboardCheckers): the game to get a
+        move from
+        - stats(bool): also return statistics about the search
 
         Output:
-        - tuple(
-            tuple(int,int),
-            tuple(int,int,str)
-            )
+        - Move, or tuple(Move, SearchStats) if stats is True
+        """
+        start = time.perf_counter()
+        nodes = self.nodes
+        if stats:
+            self.stats = SearchStats()
+        try:
+            move = self._get_move(new_board_state)
+        finally:
+            search_stats = self.stats
+            self.stats = None
+        if not stats:
+            return move
+        search_stats.searches = 1
+        search_stats.nodes = self.nodes - nodes
+        search_stats.total_time = time.perf_counter() - start
+        return move, search_stats
+
+    def _get_move(self, new_board_state):
+        """
+        Finds the move get_move returns.
         """
         current_board = new_board_state
+        if self.bitboard and not isinstance(current_board, BitboardCheckers):
+            start = time.perf_counter()
+            current_board = BitboardCheckers.from_checkers(current_board)
+            if self.stats is not None:
+                self.stats.copy_time += time.perf_counter() - start
         if self.random:
             return self.random_move(new_board_state)
         else:
@@ -166,16 +625,259 @@ class Bot:
                 maxing = True
             else:
                 maxing = False
-            alpha = np.NINF
-            beta = np.inf
-            _, move = self.minimax(current_board, depth, maxing, alpha, beta)
-            return move
+            if self.tt is not None:
+                self.tt.new_search()
+            self._killers = []
+            self._history = {}
+            self._searches += 1
+            previous = current_board.evaluator
+            if self.evaluator is not None:
+                current_board.set_evaluator(self.evaluator)
+            # listeners of the game should not hear about the search
+            try:
+                with current_board.muted():
+                    if self.time_limit is None:
+                        _, move = self.root_search(
+                            current_board, depth, maxing
+                        )
+                        self._depth_reached = depth
+                    else:
+                        _, move = self.iterative_deepening(
+                            current_board, maxing
+                        )
+                    if self.stats is not None:
+                        self.stats.depth = self._depth_reached
+                        self.stats.pv = self.principal_variation(
+                            current_board, move, self._depth_reached
+                        )
+                    return move
+            finally:
+                if current_board.evaluator is not previous:
+                    current_board.set_evaluator(previous)
+
+    def principal_variation(self, game, move, depth):
+        """
+        Follows the best moves stored in the transposition table from a
+        position, to find the moves the bot expects both sides to play.
+
+        Input:
+        - game(Checkers or BitboardCheckers): the position searched, left
+        unchanged
+        - move(Move): the best move found in the position
+        - depth(int): the most moves to follow
+
+        Output:
+        - list(Move)
+        """
+        pv = []
+        records = []
+        while (
+            move
+            and len(pv) < depth
+            and move in game.legal_moves(game.board.turn)
+        ):
+            pv.append(move)
+            records.append(game.make_move_unchecked(move))
+            if self.tt is None:
+                break
+            entry = self.tt.probe(game.zobrist_key())
+            if entry is None:
+                break
+            move = entry[3]
+        for move_records in reversed(records):
+            game.unmake_move(move_records)
+        return pv
+
+    def iterative_deepening(self, game, maxing):
+        """
+        Searches depth 1, 2, ... up to self.depth until self.time_limit
+        seconds have passed (if the bot has a time limit), starting every
+        search with the best move of the previous one. Depth 1 is always
+        finished so there is always a move. A bot searching with pvs (and a
+        single process) searches every depth after the first with an
+        aspiration window around the value of the previous depth.
+
+        Input:
+        - game(Checkers or BitboardCheckers): the game to get a move from
+        - maxing(bool): whether the bot is the maxing(LIGHT) side
+
+        Output:
+        - tuple(
+            int, -> the value of the deepest finished search
+            Move
+            )
+        """
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.time() + self.time_limit
+        self._deadline = None
+        eval = None
+        move = None
+        for depth in range(1, self.depth + 1):
+            try:
+                if self.pvs and self.workers <= 1 and eval is not None:
+                    eval, move = self.aspiration_search(
+                        game, depth, maxing, eval, move
+                    )
+                else:
+                    eval, move = self.root_search(
+                        game, depth, maxing, first_move=move
+                    )
+            except _SearchTimeout:
+                break
+            finally:
+                self._deadline = deadline
+            self._depth_reached = depth
+            # the game is decided, searching deeper will not change the move
+            if eval in (np.inf, -np.inf):
+                break
+        self._deadline = None
+        return eval, move
+
+    def aspiration_search(self, game, depth, maxing, guess, first_move):
+        """
+        Searches the current position with a window of the ASPIRATION of the
+        game's evaluator on either side of a guess of its value, which
+        prunes more than the full window when the guess is right. If the
+        value falls outside the window, that side of the window is opened
+        and the position searched again.
 
-    def move(self, new_board_state):
+        Input:
+        - game(Checkers or BitboardCheckers): the game to get a move from
+        - depth(int): the depth to search to
+        - maxing(bool): whether the bot is the maxing(LIGHT) side
+        - guess(int): the expected value, from LIGHT's point of view
+        - first_move(None or Move): a move to search before all others
+
+        Output:
+        - tuple(
+            int,
+            Move
+            )
+        """
+        window = game.evaluator.ASPIRATION
+        alpha = guess - window
+        beta = guess + window
+        while True:
+            eval, move = self.search(
+                game, depth, maxing, alpha, beta, first_move=first_move
+            )
+            # a move that beat the window for the bot is its new best move,
+            # a search that fell short of it has no best move
+            if eval <= alpha and alpha != -np.inf:
+                alpha = -np.inf
+                better = not maxing
+            elif eval >= beta and beta != np.inf:
+                beta = np.inf
+                better = maxing
+            else:
+                return eval, move
+            if better:
+                first_move = move
+            if self.stats is not None:
+                self.stats.researches += 1
+
+    def root_search(self, game, depth, maxing, first_move=None):
+        """
+        Searches the current position to a given depth, on the bot's worker
+        processes if it has more than one.
+
+        The first move (the most promising one) is searched here first to get
+        a good bound. The other root moves are then searched by the workers,
+        which share the best value found so far as their alpha (beta for
+        DARK), so a worker starting later searches with a tighter window.
+
+        Input:
+        - game(Checkers or BitboardCheckers): the game to get a move from
+        - depth(int): the depth to search to
+        - maxing(bool): whether the bot is the maxing(LIGHT) side
+        - first_move(None or Move): a move to search before all others
+
+        Output:
+        - tuple(
+            int,
+            Move
+            )
+        """
+        if self.workers <= 1 or depth <= 1:
+            return self.search(
+                game, depth, maxing, -np.inf, np.inf, first_move=first_move
+            )
+        if maxing:
+            color = "LIGHT"
+        else:
+            color = "DARK"
+        if first_move is None and self.tt is not None:
+            entry = self.tt.probe(game.zobrist_key())
+            if entry is not None:
+                first_move = entry[3]
+        moves = self._order_moves(game, game.legal_moves(color), first_move, 0)
+        if len(moves) <= 1:
+            return self.search(
+                game, depth, maxing, -np.inf, np.inf, first_move=first_move
+            )
+        # eldest brother, searched with the full window
+        records = game.make_move_unchecked(moves[0])
+        try:
+            best_eval, _ = self.search(
+                game, depth - 1, not maxing, -np.inf, np.inf, ply=1
+            )
+        finally:
+            game.unmake_move(records)
+        best_move = moves[0]
+        if self._pool is None:
+            self._bound = Value("d", 0.0)
+            self._pool = Pool(
+                self.workers,
+                initializer=_init_search_worker,
+                initargs=(
+                    self._bound,
+                    self._tt_mb,
+                    self.ordering,
+                    self.quiescence,
+                    self.pvs,
+                ),
+            )
+        self._bound.value = best_eval
+        # the position travels as the compact bytes of position.py, much
+        # smaller and faster to rebuild than a pickled game
+        position = (type(game), game.to_bytes(), game.evaluator)
+        tasks = [
+            (position, move, depth, maxing, self._deadline, self._searches)
+            for move in moves[1:]
+        ]
+        for move, result in zip(
+            moves[1:], self._pool.imap(_search_root_move, tasks)
+        ):
+            if result is None:
+                raise _SearchTimeout
+            eval, bound, nodes = result
+            self.nodes += nodes
+            # values that did not beat the bound they were searched with are
+            # only bounds themselves, and cannot be the best move
+            if maxing and eval > bound and eval > best_eval:
+                best_eval = eval
+                best_move = move
+            elif not maxing and eval < bound and eval < best_eval:
+                best_eval = eval
+                best_move = move
+        return best_eval, best_move
+
+    def close(self):
+        """
+        Shuts down the bot's worker processes, if it has any.
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def move(self, new_board_state, stats=None):
         """
         actively changes the board state on game object in place
         Input:
         - new_board_state(Checkers): the gave to be moved
+        - stats(None or SearchStats): if given, the statistics of the search
+        for the move are added to it
 
         Output:
         - Checkers obj: the changed game
@@ -187,18 +889,258 @@ class Bot:
         elif new_board_state.board.turn != self.color:
             print("It is not our turn")
         else:
-            piece, move = self.get_move(new_board_state)
-            p_x, p_y = piece
-            is_king = new_board_state.board.board_grid[p_x][p_y].piece.king
-            new_board_state.move_piece(piece, move, self.color, king=is_king)
+            if stats is None:
+                move = self.get_move(new_board_state)
+            else:
+                move, move_stats = self.get_move(new_board_state, stats=True)
+                stats.merge(move_stats)
+            new_board_state.make_move_unchecked(move)
             return new_board_state
 
+# the bot a root search worker process searches with, and the best value
+# found so far shared by all the workers
+_worker_bot = None
+_worker_bound = None
+_worker_search = None
+
+
+def _init_search_worker(bound, tt_mb, ordering, quiescence, pvs):
+    """
+    Sets up a worker process of a Bot's root search pool.
+
+    Input:
+    - bound(multiprocessing.Value): the best value found so far
+    - tt_mb(float): memory cap of the worker's transposition table
+    - ordering(bool): if the worker orders moves
+    - quiescence(int): positions the worker searches past each leaf
+    - pvs(bool): if the worker searches with negamax
+    """
+    global _worker_bot, _worker_bound
+    _worker_bound = bound
+    _worker_bot = Bot(
+        1,
+        "LIGHT",
+        tt_mb=tt_mb,
+        ordering=ordering,
+        quiescence=quiescence,
+        pvs=pvs,
+    )
+
+
+def _search_root_move(args):
+    """
+    Searches one root move in a worker process of a Bot's root search pool.
+
+    Input:
+    - args(tuple): the class, bytes and evaluator of the game, the root
+        move, the depth of the root search, whether the root side is maxing,
+        the deadline of the search (or None) and the number of the bot's
+        search
+
+    Output:
+    - tuple(
+        int, -> the value of the move
+        int, -> the bound the move was searched with
+        int -> the number of positions visited
+        )
+      or None if the time ran out
+    """
+    global _worker_search
+    position, move, depth, maxing, deadline, search = args
+    bot = _worker_bot
+    if search != _worker_search:
+        _worker_search = search
+        if bot.tt is not None:
+            bot.tt.new_search()
+        bot._killers = []
+        bot._history = {}
+    game_class, data, evaluator = position
+    game = game_class.from_bytes(data, evaluator)
+    bound = _worker_bound.value
+    if maxing:
+        alpha, beta = bound, np.inf
+    else:
+        alpha, beta = -np.inf, bound
+    nodes = bot.nodes
+    bot._deadline = deadline
+    game.make_move_unchecked(move)
+    try:
+        eval, _ = bot.search(game, depth - 1, not maxing, alpha, beta, ply=1)
+    except _SearchTimeout:
+        return None
+    finally:
+        bot._deadline = None
+    with _worker_bound.get_lock():
+        if maxing and eval > _worker_bound.value:
+            _worker_bound.value = eval
+        elif not maxing and eval < _worker_bound.value:
+            _worker_bound.value = eval
+    return eval, bound, bot.nodes - nodes
+
+
+def play_game(i, seed, settings, record_file=None):
+    """
+    Plays game number i of a bot_v_bot run. Bot1 plays LIGHT in even games
+    and DARK in odd games.
+
+    Input:
+    - i(int): the number of the game
+    - seed(int): seed for the random moves of the game
+    - settings(dict): the bot_v_bot options bot1, bot2, play_len, bitboard,
+        time1, time2, search_workers, eval1, eval2, mcts1, mcts2, quiesce1,
+        quiesce2, pvs1, pvs2, stats and record_format, and the names of the
+        bots
+    - record_file(None or file): text file the moves of the game are
+        written to as they are played, in settings["record_format"]
+
+    Output:
+    - tuple(
+        str or tuple, -> "Bot1", "Bot2" or "Draw"
+        float, -> how long the game took
+        None or tuple(SearchStats, SearchStats) -> the search statistics
+            of bot1 and bot2 if settings["stats"] is set
+        )
+    """
+    random.seed(seed)
+    start = time.time()
+    if i % 2 == 0:
+        bot1_col = "LIGHT"
+        bot2_col = "DARK"
+        win_state = "White Wins"
+        loss_state = "Black Wins"
+    else:
+        bot1_col = "DARK"
+        bot2_col = "LIGHT"
+        win_state = "Black Wins"
+        loss_state = "White Wins"
+    if settings["bitboard"]:
+        game = BitboardCheckers(settings["play_len"])
+    else:
+        game = Checkers(settings["play_len"])
+    win_bot = _make_bot(settings, 1, bot1_col)
+    rand_bot = _make_bot(settings, 2, bot2_col)
+    stats = None
+    if settings["stats"]:
+        stats = (SearchStats(), SearchStats())
+    writer = None
+    if record_file is not None:
+        names = settings["names"]
+        if i % 2 == 1:
+            names = names[::-1]
+        writer = GameWriter(record_file, settings["record_format"])
+        writer.start(
+            game,
+            {
+                "Event": "checkers-bot",
+                "Round": str(i + 1),
+                "White": names[0],
+                "Black": names[1],
+                "Seed": str(seed),
+            },
+        )
+    while game.check_winner() == "No Winner":
+        if game.board.turn == bot1_col:
+            win_bot.move(game, stats and stats[0])
+        elif game.board.turn == bot2_col:
+            rand_bot.move(game, stats and stats[1])
+    end = time.time()
+    status = game.check_winner()
+    if writer is not None:
+        writer.finish(game, status)
+    win_bot.close()
+    rand_bot.close()
+    if status == win_state:
+        result = "Bot1"
+    elif status == loss_state:
+        result = "Bot2"
+    elif status == "DRAW":
+        result = "Draw"
+    else:
+        result = ("something bad happened", status)
+    return result, end - start, stats
+
+
+def _make_bot(settings, number, color):
+    """
+    Creates bot1 or bot2 of a bot_v_bot run.
+
+    Input:
+    - settings(dict): the bot_v_bot options, see play_game
+    - number(int): 1 or 2
+    - color(str): the color the bot plays
+
+    Output:
+    - Bot or MCTSBot
+    """
+    time_limit = settings[f"time{number}"]
+    iterations = settings[f"mcts{number}"]
+    if iterations is not None:
+        return MCTSBot(
+            color, iterations=iterations or None, time_limit=time_limit
+        )
+    return Bot(
+        settings[f"bot{number}"],
+        color,
+        time_limit=time_limit,
+        workers=settings["search_workers"],
+        evaluator=EVALUATORS[settings[f"eval{number}"]](),
+        quiescence=settings[f"quiesce{number}"],
+        pvs=settings[f"pvs{number}"],
+    )
+
+
+def _mcts_name(iterations, seconds):
+    """
+    Returns the description of an MCTS bot printed by bot_v_bot.
+    """
+    name = "MCTS"
+    if iterations > 0:
+        name += f", {iterations} Iterations"
+    if seconds is not None:
+        name += f", {seconds}s per Move"
+    return name
+
+
+def _play_game_star(args):
+    """
+    Unpacks the arguments of play_game for Pool.imap. Games played on a
+    worker process are recorded in memory and returned with the results,
+    for the main process to write.
+    """
+    if args[2]["record_format"] is None:
+        return play_game(*args), None
+    record_file = io.StringIO()
+    return play_game(*args, record_file), record_file.getvalue()
+
+
 @click.command(name = "checkers-bot")
 @click.option ('-n','--num-games', type = click.INT, default = 100)
 @click.option('--bot1', type = click.INT, default = 2)
 @click.option('--bot2', type = click.INT, default = 0)
 @click.option('--play_len', type = click.INT, default = 3)
-def bot_v_bot(num_games, bot1 = 2, bot2 = 0, play_len=3):
+@click.option('--bitboard', is_flag = True, default = False)
+@click.option('--time1', type = click.FLOAT, default = None)
+@click.option('--time2', type = click.FLOAT, default = None)
+@click.option('--workers', type = click.INT, default = 1)
+@click.option('--seed', type = click.INT, default = None)
+@click.option('--search-workers', type = click.INT, default = 1)
+@click.option('--eval1', type = click.Choice(sorted(EVALUATORS)),
+              default = "material")
+@click.option('--eval2', type = click.Choice(sorted(EVALUATORS)),
+              default = "material")
+@click.option('--stats', is_flag = True, default = False)
+@click.option('--record', type = click.Path(dir_okay = False), default = None)
+@click.option('--mcts1', type = click.INT, default = None)
+@click.option('--mcts2', type = click.INT, default = None)
+@click.option('--quiesce1', type = click.INT, default = 0)
+@click.option('--quiesce2', type = click.INT, default = 0)
+@click.option('--pvs1', is_flag = True, default = False)
+@click.option('--pvs2', is_flag = True, default = False)
+def bot_v_bot(num_games, bot1 = 2, bot2 = 0, play_len=3, bitboard=False,
+              time1=None, time2=None, workers=1, seed=None,
+              search_workers=1, eval1="material", eval2="material",
+              stats=False, record=None, mcts1=None, mcts2=None,
+              quiesce1=0, quiesce2=0, pvs1=False, pvs2=False):
     """
     Runs a script of n Checkers games of a bot of a given depth against another
     bot of a given depth on a given board size
@@ -208,6 +1150,34 @@ def bot_v_bot(num_games, bot1 = 2, bot2 = 0, play_len=3):
     - bot2(int): the depth of second bot
     - play_len(int): the number of starting rows per player to find the board
         length, given by 2*play_len + 2 (i.e. play_len 3 is a board len of 8)
+    - bitboard(bool): play the games on BitboardCheckers instead of Checkers
+    - time1(None or float): seconds per move for the first bot, which then
+        searches as deep as it can in that time (up to a depth of bot1)
+    - time2(None or float): seconds per move for the second bot
+    - workers(int): number of processes to play the games on
+    - seed(None or int): game i is played with seed + i, a random seed is
+        picked if None
+    - search_workers(int): number of processes each smart bot searches on,
+        can only be used with workers = 1
+    - eval1(str): name of the evaluator of the first bot
+    - eval2(str): name of the evaluator of the second bot
+    - stats(bool): print search statistics of the smart bots for every game
+        and for all games together
+    - record(None or str): file the moves of every game are appended to as
+        they are played, as JSON lines if it ends in .jsonl and as PDN
+        otherwise (see records.py)
+    - mcts1(None or int): if given, the first bot is an MCTSBot running
+        this many iterations per move (0 for no limit, which needs time1),
+        instead of a minimax bot of depth bot1
+    - mcts2(None or int): the same for the second bot
+    - quiesce1(int): if more than 0, the first bot searches captures that
+        are pending at its depth on through captures only, looking at up to
+        this many positions per leaf, so a shallow depth does not stop in
+        the middle of an exchange
+    - quiesce2(int): the same for the second bot
+    - pvs1(bool): the first bot searches with principal variation search
+        instead of minimax, which plays the same moves faster
+    - pvs2(bool): the same for the second bot
 
     Output:
     - tuple(
@@ -217,51 +1187,113 @@ def bot_v_bot(num_games, bot1 = 2, bot2 = 0, play_len=3):
         float -> the average speed of each gme
         )
     """
+    if workers > 1 and search_workers > 1:
+        # pool worker processes cannot start pools of their own
+        raise click.UsageError(
+            "--workers and --search-workers cannot both be more than 1"
+        )
+    if seed is None:
+        seed = random.randrange(2**32)
+    for iterations, seconds in ((mcts1, time1), (mcts2, time2)):
+        if iterations is not None and iterations <= 0 and seconds is None:
+            raise click.UsageError(
+                "MCTS bots without an iteration limit need --time1/--time2"
+            )
+    if mcts1 is not None:
+        bot1_int = _mcts_name(mcts1, time1)
+    elif bot1 <= 0:
+        bot1_int = "Random"
+    else:
+        bot1_int = f"Smart, Depth of {bot1}"
+        if time1 is not None:
+            bot1_int += f", {time1}s per Move"
+        if eval1 != "material":
+            bot1_int += f", {eval1.title()} Evaluation"
+        if quiesce1 > 0:
+            bot1_int += f", Quiescence of {quiesce1}"
+        if pvs1:
+            bot1_int += ", PVS"
+    if mcts2 is not None:
+        bot2_int = _mcts_name(mcts2, time2)
+    elif bot2 <= 0:
+        bot2_int = "Random"
+    else:
+        bot2_int = f"Smart, Depth of {bot2}"
+        if time2 is not None:
+            bot2_int += f", {time2}s per Move"
+        if eval2 != "material":
+            bot2_int += f", {eval2.title()} Evaluation"
+        if quiesce2 > 0:
+            bot2_int += f", Quiescence of {quiesce2}"
+        if pvs2:
+            bot2_int += ", PVS"
+    record_format = None
+    if record is not None:
+        record_format = "jsonl" if record.endswith(".jsonl") else "pdn"
+    settings = {
+        "bot1": bot1,
+        "bot2": bot2,
+        "mcts1": mcts1,
+        "mcts2": mcts2,
+        "quiesce1": quiesce1,
+        "quiesce2": quiesce2,
+        "pvs1": pvs1,
+        "pvs2": pvs2,
+        "play_len": play_len,
+        "bitboard": bitboard,
+        "time1": time1,
+        "time2": time2,
+        "search_workers": search_workers,
+        "eval1": eval1,
+        "eval2": eval2,
+        "stats": stats,
+        "record_format": record_format,
+        "names": (f"Bot1 ({bot1_int})", f"Bot2 ({bot2_int})"),
+    }
+    games = [(i, seed + i, settings) for i in range(num_games)]
+    record_file = None
+    if record is not None:
+        # games are appended to the file as they are played, buffered so
+        # that not every move is a write to the disk
+        record_file = open(record, "a", buffering=1 << 16)
+    try:
+        if workers > 1:
+            # imap returns the games in order, whichever worker finishes
+            # first, and each game's record is written as it comes back
+            results = []
+            with Pool(workers) as pool:
+                for result, text in pool.imap(_play_game_star, games):
+                    if record_file is not None:
+                        record_file.write(text)
+                    results.append(result)
+        else:
+            results = [play_game(*game, record_file) for game in games]
+    finally:
+        if record_file is not None:
+            record_file.close()
     bot1wins = 0
     bot2wins = 0
     win_lst = []
     time_lst = []
-    for i in range(num_games):
-        start = time.time()
-        if i % 2 == 0:
-            bot1_col = "LIGHT"
-            bot2_col = "DARK"
-            win_state = "White Wins"
-            loss_state = "Black Wins"
-        else:
-            bot1_col = "DARK"
-            bot2_col = "LIGHT"
-            win_state = "Black Wins"
-            loss_state = "White Wins"
-        game = Checkers(play_len)
-        win_bot = Bot(bot1, bot1_col)
-        rand_bot = Bot(bot2, bot2_col)
-        while game.check_winner() == "No Winner":
-            if game.board.turn == bot1_col:
-                win_bot.move(game)
-            elif game.board.turn == bot2_col:
-                rand_bot.move(game)
-        end = time.time()
-        time_lst.append(end - start)
-        if game.check_winner() == win_state:
+    totals = (SearchStats(), SearchStats())
+    # random bots have no search statistics worth printing
+    searching = (bot1 > 0 or mcts1 is not None, bot2 > 0 or mcts2 is not None)
+    for i, (result, duration, game_stats) in enumerate(results):
+        if game_stats is not None:
+            for name, search, bot_stats, total in zip(
+                ("Bot1", "Bot2"), searching, game_stats, totals
+            ):
+                if search:
+                    print(f"Game {i}, {name} (result: {result}):")
+                    print(bot_stats.summary())
+                total.merge(bot_stats)
+        time_lst.append(duration)
+        win_lst.append(result)
+        if result == "Bot1":
             bot1wins += 1
-            win_lst.append("Bot1")
-        elif game.check_winner() == loss_state:
+        elif result == "Bot2":
             bot2wins += 1
-            win_lst.append("Bot2")
-        elif game.check_winner() == "DRAW":
-            win_lst.append("Draw")
-        else:
-            win_lst.append(("something bad happened", game.check_winner()))
     n = num_games
-    if bot1 <= 0:
-        bot1_int = "Random"
-    else:
-        bot1_int = f"Smart, Depth of {bot1}"
-    if bot2 <= 0:
-        bot2_int = "Random"
-    else:
-        bot2_int = f"Smart, Depth of {bot2}"
     bot1_perc = 100 * bot1wins / n
     bot2_perc = 100 * bot2wins / n
     ties = 100 * (n - bot1wins - bot2wins) / n
@@ -270,6 +1302,11 @@ def bot_v_bot(num_games, bot1 = 2, bot2 = 0, play_len=3):
     print(f"Bot2 ({bot2_int}): won {bot2wins}/{n} or {bot2_perc}% of games")
     print(f"Ties: {ties}%")
     print(f"Average Time per Game: {avg_gametime}")
+    if stats:
+        for name, search, total in zip(("Bot1", "Bot2"), searching, totals):
+            if search:
+                print(f"{name} over all games:")
+                print(total.summary())
     return bot1_perc, bot2_perc, win_lst, avg_gametime
 
 if __name__ == "__main__":
@@ -11,12 +11,40 @@ x.piece_all_moves((3,2), "LIGHT")
 # Returns a list with all the moves of the piece at (3,2)
 x.all_moves("LIGHT")
 # Returns a dictionary with all the moves white can make.
+x.legal_moves("LIGHT")
+# Returns a list of Moves, with every multi-jump as one Move
+record = x.make_move(x.legal_moves("LIGHT")[0])
+# Plays a whole Move, jump by jump; x.unmake_move(record) takes it back.
+# Engine code plays moves it just generated with x.make_move_unchecked(move)
 x.check_winner()
 # Returns a string that states the winner color or no winner.
+record = x.apply_move((5,0),(4,1,'NC'), "DARK")
+# Same as move_piece, but returns a record of the move (None if illegal)
+x.undo_move(record)
+# Takes the move back, restoring the board exactly as it was
+x.subscribe(print)
+# Calls print with a GameEvent for every move, capture and promotion
+x = Checkers(3, verbosity=2)
+# Prints messages and the board after every move, like a terminal game
+x = Checkers(3, evaluator=PositionalEvaluator())
+# Scores positions with an evaluator from evaluation.py
+y = Checkers.from_fen(x.to_fen())
+# Creates a game in the same position (to_bytes/from_bytes are the binary
+# format, see position.py)
 
 """
+from contextlib import contextmanager
+from typing import NamedTuple
+
 from colorama import Fore
 
+import position
+from evaluation import DEFAULT_EVALUATOR
+from transposition import TURN_KEY, zobrist_keys
+
+# check every move played with make_move_unchecked, for debugging the engine
+DEBUG_MOVES = False
+
 
 class Square:
     """
@@ -33,6 +61,10 @@ class Square:
     west (None or square): The piece west of the square
     """
 
+    __slots__ = (
+        "color", "row", "column", "piece", "north", "east", "south", "west"
+    )
+
     def __init__(self, color_sq, row, column):
         """
         Constructor
@@ -208,7 +240,7 @@ class Checkers:
     the Board class.
     """
 
-    def __init__(self, n=3):
+    def __init__(self, n=3, verbosity=0, evaluator=None):
         """
         Constructor
 
@@ -218,16 +250,41 @@ class Checkers:
         num_dark (int): number of dark pieces on the board
         side_len (int): length of board
         moves_since_capture (int): moves since capture
+        zobrist (int): Zobrist hash of the pieces on the board
+        evaluator (Evaluator): scores the pieces for calculate_boardstate
+        score (int): sum of the evaluator's values of all pieces on the board
+        listeners (list[callable]): functions called with every GameEvent
 
         Parameters:
             n: int (number of starting rows with pieces for each player)
+            verbosity: int (0 is silent, 1 prints messages about moves, 2
+            also prints the board after every move)
+            evaluator: Evaluator or None (None uses material only)
 
         Initializes empty checkers board.
         """
+        self.listeners = []
+        if verbosity > 0:
+            self.subscribe(TerminalRenderer(self, verbosity))
         self.num_light = 0
         self.num_dark = 0
         self.side_len = 2 * n + 2
+        # moves of every piece, pieces that can capture, and squares changed
+        # since the moves were cached
+        self._move_cache = None
+        self._capturers = {"LIGHT": set(), "DARK": set()}
+        self._movable = {"LIGHT": set(), "DARK": set()}
+        self._dirty = set()
+        # result of check_winner and the winner it sets, None until the
+        # board changes are looked at again
+        self._status = None
+        self._diagonals = _diagonals(self.side_len)
         self.moves_since_capture = 0
+        self.zobrist = 0
+        self._zobrist_keys = zobrist_keys(self.side_len)
+        self.evaluator = evaluator or DEFAULT_EVALUATOR
+        self._values = self.evaluator.table(self.side_len)
+        self.score = 0
         self.board = self._place_pieces(Board(self.side_len, self.side_len))
         for i, sq_lst in enumerate(self.board.board_grid):
             for j, sq in enumerate(sq_lst):
@@ -252,15 +309,31 @@ class Checkers:
             for j, sq in enumerate(sq_lst):
                 if sq.color == "DARK":
                     if i < n:
-                        board.board_grid[i][j].piece = Checkers_Piece("LIGHT")
+                        board.board_grid[i][j].piece = PIECES[
+                            ("LIGHT", False)
+                        ]
                         self.num_light += 1
+                        self.zobrist ^= self._zobrist_key(
+                            (i, j), "LIGHT", False
+                        )
+                        self.score += self._values[("LIGHT", False)][
+                            i * self.side_len + j
+                        ]
                     elif (
                         len(board.board_grid) - n - 1
                         < i
                         < len(board.board_grid)
                     ):
-                        board.board_grid[i][j].piece = Checkers_Piece("DARK")
+                        board.board_grid[i][j].piece = PIECES[
+                            ("DARK", False)
+                        ]
                         self.num_dark += 1
+                        self.zobrist ^= self._zobrist_key(
+                            (i, j), "DARK", False
+                        )
+                        self.score += self._values[("DARK", False)][
+                            i * self.side_len + j
+                        ]
         return board
 
     def __str__(self):
@@ -269,24 +342,77 @@ class Checkers:
         """
         return Board._board_str(self.board)
 
+    def subscribe(self, listener):
+        """
+        Calls listener with a GameEvent for every move, capture, promotion,
+        end of turn, illegal move and undo from now on.
+
+        Parameters:
+            listener (callable): function taking a GameEvent
+
+        Returns: None
+        """
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """
+        Stops calling a listener added with subscribe.
+
+        Parameters:
+            listener (callable): function taking a GameEvent
+
+        Returns: None
+        """
+        self.listeners.remove(listener)
+
+    @contextmanager
+    def muted(self):
+        """
+        Context manager that detaches all listeners while it is open, for
+        example while a bot searches on the game.
+        """
+        listeners = self.listeners
+        self.listeners = []
+        try:
+            yield self
+        finally:
+            self.listeners = listeners
+
+    def _emit(self, kind, color, start=None, end=None):
+        """
+        Calls every listener with a new GameEvent. Callers check
+        self.listeners first, so nothing is built when no one listens.
+        """
+        event = GameEvent(kind, color, start, end)
+        for listener in self.listeners:
+            listener(event)
+
     def check_winner(self):
         """
         Checks the current board to see if there is a winner.
 
         Parameters: (None)
 
+        The status is kept until the board changes (and restored by
+        undo_move), so calling this again costs nothing. After a move, only
+        the moves of pieces near the changed squares are regenerated.
+
         Returns: str ("Black Wins" or "White Wins" or "No Winner")
         """
-        if self.num_light == 0 or len(self.all_moves("LIGHT")) == 0:
-            self.board.winner = "DARK"
-            return "Black Wins"
-        elif self.num_dark == 0 or len(self.all_moves("DARK")) == 0:
-            self.board.winner = "LIGHT"
-            return "White Wins"
-        elif self.moves_since_capture == 40:
-            self.board.winner = "DRAW"
-            return "DRAW"
-        return "No Winner"
+        if self._status is None:
+            self._update_move_cache()
+            if self.num_light == 0 or not self._movable["LIGHT"]:
+                self._status = ("Black Wins", "DARK")
+            elif self.num_dark == 0 or not self._movable["DARK"]:
+                self._status = ("White Wins", "LIGHT")
+            elif self.moves_since_capture == 40:
+                self._status = ("DRAW", "DRAW")
+            else:
+                self._status = ("No Winner", None)
+        result, winner = self._status
+        if winner is not None:
+            self.board.winner = winner
+        return result
 
     def resign(self, color_player):
         """
@@ -337,47 +463,151 @@ class Checkers:
 
         Returns: str
         """
-        # Need to input (row, column)
-        if color_p != self.board.turn:
-            print("Move Not Legal")
-            return "Move Not Legal"
-        if not self._check_sq(piece_loc, color_p):
-            print("Move Not Legal")
+        record = self.apply_move(piece_loc, board_loc, color_p, king, capture)
+        if record is None:
             return "Move Not Legal"
+        return record.result
+
+    def apply_move(
+        self, piece_loc, board_loc, color_p, king=False, capture=False
+    ):
+        """
+        Moves a piece exactly like move_piece, but returns a MoveRecord of
+        everything the move changed so that it can be taken back with
+        undo_move.
+
+        Parameters: same as move_piece
+
+        Returns: MoveRecord, or None if the move is not legal
+        """
+        # Need to input (row, column)
+        if (
+            color_p != self.board.turn
+            or not self._check_sq(piece_loc, color_p)
+            or board_loc
+            not in self.piece_all_moves(piece_loc, color_p, king, capture)
+        ):
+            if self.listeners:
+                self._emit("illegal", color_p, piece_loc, board_loc)
+            return None
+        return self._apply(piece_loc, board_loc, color_p, king)
+
+    def _apply(self, piece_loc, board_loc, color_p, king, again=None):
+        """
+        Moves a piece without checking that the move is legal. Used by
+        apply_move once it has checked the move, and directly by the move
+        generator and make_move_unchecked, whose moves are known to be legal.
+
+        Parameters:
+            piece_loc, board_loc, color_p, king: same as apply_move
+            again (None or bool): whether the piece has to move again after
+            the move, looked up from its moves if None
+
+        Returns: MoveRecord
+        """
         row1 = piece_loc[0]
         col1 = piece_loc[1]
         row2 = board_loc[0]
         col2 = board_loc[1]
-        lst_moves = self.piece_all_moves(piece_loc, color_p, king, capture)
-        if board_loc not in lst_moves:
-            print("Move Not Legal")
-            return "Move Not Legal"
         if color_p == "LIGHT":
             opp_color = "DARK"
         else:
             opp_color = "LIGHT"
+        record = MoveRecord(
+            (row1, col1),
+            (row2, col2),
+            color_p,
+            self.board.board_grid[row1][col1].piece.king,
+            self.board.turn,
+            self.moves_since_capture,
+            self.board.winner,
+        )
+        record.status = self._status
         self._remove_piece((row1, col1))
         to_king = king
-        if board_loc[0] == 0 or board_loc[0] == self.board.rows - 1:
+        if row2 == self._diagonals["promotion"][color_p]:
             to_king = True
+        record.promoted = to_king and not record.king
         self._place_piece((row2, col2), color_p, to_king)
         self.moves_since_capture += 1
         if board_loc[2] == "C":
-            self._remove_piece(((row1 + row2) // 2, (col1 + col2) // 2))
+            cap_loc = ((row1 + row2) // 2, (col1 + col2) // 2)
+            record.captured = (
+                cap_loc,
+                self.board.board_grid[cap_loc[0]][cap_loc[1]].piece,
+            )
+            self._remove_piece(cap_loc)
             self.moves_since_capture = 0
-        print(self)
-        if (
-            board_loc[2] == "C"
-            and len(self.piece_all_moves((row2, col2), color_p, king, True))
-            != 0
-        ):
-            print("Move Piece Again")
+        # only further captures let the same piece move again
+        if again is None:
+            again = board_loc[2] == "C" and any(
+                m[2] == "C"
+                for m in self.piece_all_moves(
+                    (row2, col2), color_p, king, True
+                )
+            )
+        if again:
             self.board.turn = color_p
-            return "Move Piece Again"
+            record.result = "Move Piece Again"
         else:
-            print("End Turn")
             self.board.turn = opp_color
-            return "End Turn"
+            record.result = "End Turn"
+        if self.listeners:
+            self._emit_move(record)
+        return record
+
+    def _emit_move(self, record):
+        """
+        Emits the events of a move made with apply_move: the move itself,
+        then its capture and promotion if any, then "move_again" or
+        "end_turn".
+        """
+        color = record.color
+        self._emit("move", color, record.piece_loc, record.board_loc)
+        if record.captured is not None:
+            self._emit("capture", color, record.captured[0])
+        if record.promoted:
+            self._emit("promotion", color, record.board_loc)
+        if record.result == "Move Piece Again":
+            self._emit("move_again", color, record.board_loc)
+        else:
+            self._emit("end_turn", color)
+
+    def undo_move(self, record):
+        """
+        Takes back a move made with apply_move, restoring the moved piece,
+        any captured piece, the turn, moves_since_capture and the winner.
+        Moves must be undone in the reverse order they were applied.
+
+        Parameters:
+        record (MoveRecord): the record returned by apply_move
+
+        Returns: None
+        """
+        self._remove_piece(record.board_loc)
+        self._place_piece(record.piece_loc, record.color, record.king)
+        if record.captured is not None:
+            cap_loc, cap_piece = record.captured
+            self._place_piece(cap_loc, cap_piece.color, cap_piece.king)
+        self.board.turn = record.turn
+        self.moves_since_capture = record.moves_since_capture
+        self.board.winner = record.winner
+        self._status = record.status
+        if self.listeners:
+            self._emit(
+                "undo", record.color, record.piece_loc, record.board_loc
+            )
+
+    def is_king(self, loc):
+        """
+        Returns whether the piece at loc is a king.
+
+        Parameters:
+        loc (tuple(int, int)): coordinates of the piece
+
+        Returns: bool
+        """
+        return self.board.board_grid[loc[0]][loc[1]].piece.king
 
     def _check_sq(self, piece_loc, color_p):
         """
@@ -425,135 +655,438 @@ class Checkers:
         Returns: list[tuple(int, int)]
         """
         # input coords as (row, column)
-        lst_moves = []
-        row1 = piece_loc[0]
-        col1 = piece_loc[1]
-        bg = self.board.board_grid
-        start_sq = bg[row1][col1]
+        # a man moves forward, a king first backward and then forward
+        if (p_color == "LIGHT") != king:
+            steps = self._diagonals["down"][piece_loc[0]][piece_loc[1]]
+        else:
+            steps = self._diagonals["up"][piece_loc[0]][piece_loc[1]]
         if p_color == "LIGHT":
             opp_color = "DARK"
-            if not king:
-                diag = Square.down_diagonals
-            else:
-                diag = Square.up_diagonals
-        elif p_color == "DARK":
+        else:
             opp_color = "LIGHT"
-            if not king:
-                diag = Square.up_diagonals
-            else:
-                diag = Square.down_diagonals
-        for row2, col2 in diag(start_sq):
-            if p_color == "LIGHT":
-                if not king:
-                    next_row = row2 + 1
-                else:
-                    next_row = row2 - 1
-            else:
-                if not king:
-                    next_row = row2 - 1
-                else:
-                    next_row = row2 + 1
-            if bg[row2][col2].piece is None:
+        bg = self.board.board_grid
+        lst_moves = []
+        jumps = []
+        for (row2, col2), land in steps:
+            piece = bg[row2][col2].piece
+            if piece is None:
                 if not capture:
                     lst_moves.append((row2, col2, "NC"))
-                continue
-            if (
-                self.board.board_grid[row2][col2].piece.color == opp_color
-                and 0 <= next_row < self.board.rows
+            elif (
+                land is not None
+                and piece.color == opp_color
+                and bg[land[0]][land[1]].piece is None
             ):
-                if col2 > col1 and col2 + 1 < self.board.columns:
-                    next_col = col2 + 1
-                elif col2 < col1 and col2 - 1 >= 0:
-                    next_col = col2 - 1
-                else:
-                    continue
-                if bg[next_row][next_col] is not None:
-                    if bg[next_row][next_col].piece is None:
-                        lst_moves.append((next_row, next_col, "C"))
-        for coords in lst_moves:
-            if coords[2] == "C":
-                for coords2 in lst_moves:
-                    if coords2[2] == "NC":
-                        lst_moves.remove(coords2)
+                jumps.append((land[0], land[1], "C"))
+        if jumps:
+            lst_moves = jumps
+        lst_moves.sort()
         if king:
-            return list(set(lst_moves)) + self.piece_all_moves(
+            return lst_moves + self.piece_all_moves(
                 piece_loc,
                 p_color,
                 False,
             )
-        return list(set(lst_moves))
+        return lst_moves
 
     def all_moves(self, color_move):
         """
         Returns a list of all possible moves on the board.
 
+        The moves of every piece are cached and only recomputed for pieces
+        near squares that changed since the last call. Pieces and their
+        moves are in order of their squares, so the moves do not depend on
+        the history of the game (BitboardCheckers gives the same order).
+
         Parameters:
         color_move (str): color of the player
 
         Returns: dict{'tuple(int, int)': list[tuple(int, int, str)]}
         """
-        all_moves_dict = {}
+        self._update_move_cache()
+        if self._capturers[color_move]:
+            return {
+                coords: [m for m in self._move_cache[coords] if m[2] == "C"]
+                for coords in sorted(self._capturers[color_move])
+            }
         if color_move == "DARK":
             pieces_loc = self.board.pieces_black_set
-        elif color_move == "LIGHT":
+        else:
             pieces_loc = self.board.pieces_white_set
-        capture = False
-        for coords in list(pieces_loc):
-            move_lst1 = self.piece_all_moves(
-                coords,
-                color_move,
-                self.board.board_grid[coords[0]][coords[1]].piece.king,
+        return {
+            coords: list(self._move_cache[coords])
+            for coords in sorted(pieces_loc)
+            if self._move_cache[coords]
+        }
+
+    def legal_moves(self, color_move):
+        """
+        Returns every move a player can make on their turn, with a capture
+        that has to be continued (a multi-jump) given as a single Move of all
+        its jumps. Captures are generated by playing and undoing the jumps,
+        so they follow exactly the same rules as apply_move.
+
+        Parameters:
+        color_move (str): color of the player, who must be on turn
+
+        Returns: list[Move]
+        """
+        moves = []
+        with self.muted():
+            for piece_loc, targets in self.all_moves(color_move).items():
+                for target in targets:
+                    if target[2] == "C":
+                        self._add_chains(
+                            piece_loc, piece_loc, target, color_move, [], [],
+                            moves
+                        )
+                    else:
+                        moves.append(
+                            Move(piece_loc, ((target[0], target[1]),), ())
+                        )
+        return moves
+
+    def _add_chains(
+        self, start, piece_loc, board_loc, color_p, path, captured, moves
+    ):
+        """
+        Adds to moves every capture sequence of the piece that started at
+        start and is now at piece_loc, continuing with the jump to board_loc.
+
+        Parameters:
+        start (tuple(int, int)): where the piece started its turn
+        piece_loc (tuple(int, int)): where the piece is now
+        board_loc (tuple(int, int, str)): the next jump
+        color_p (str): color of the player
+        path (list[tuple(int, int)]): squares the piece has jumped to so far
+        captured (list[tuple(int, int)]): squares captured so far
+        moves (list[Move]): the list the finished sequences are added to
+
+        Returns: None
+        """
+        # the jump comes from all_moves, so it does not need checking
+        record = self._apply(
+            piece_loc, board_loc, color_p, self.is_king(piece_loc)
+        )
+        end = (board_loc[0], board_loc[1])
+        path.append(end)
+        captured.append(
+            ((piece_loc[0] + end[0]) // 2, (piece_loc[1] + end[1]) // 2)
+        )
+        try:
+            if self.board.turn == color_p:
+                for target in self.all_moves(color_p)[end]:
+                    self._add_chains(
+                        start, end, target, color_p, path, captured, moves
+                    )
+            else:
+                moves.append(Move(start, tuple(path), tuple(captured)))
+        finally:
+            path.pop()
+            captured.pop()
+            self.undo_move(record)
+
+    def make_move(self, move):
+        """
+        Plays a Move from legal_moves, applying its jumps one after another
+        with apply_move, so listeners hear about every jump.
+
+        Parameters:
+        move (Move): the move to play
+
+        Returns: list of the records of every jump, to pass to unmake_move,
+        or None if the move is not legal (the board is then unchanged)
+        """
+        records = []
+        color_p = self.board.turn
+        piece_loc = move.start
+        for end, board_loc in zip(move.path, move.targets()):
+            record = self.apply_move(
+                piece_loc, board_loc, color_p, king=self.is_king(piece_loc)
+            )
+            if record is None:
+                self.unmake_move(records)
+                return None
+            records.append(record)
+            piece_loc = end
+        return records
+
+    def make_move_unchecked(self, move):
+        """
+        Plays a Move from legal_moves like make_move, but without checking
+        that it is legal: the engine only plays moves it has just generated,
+        and checking them again would generate all moves of the position
+        once more for every jump. Set DEBUG_MOVES to check them anyway.
+
+        Parameters:
+        move (Move): a legal move of the player to move
+
+        Returns: list of the records of every jump, to pass to unmake_move
+        """
+        if DEBUG_MOVES:
+            assert move in self.legal_moves(self.board.turn), (
+                f"illegal move {move}"
+            )
+        records = []
+        color_p = self.board.turn
+        piece_loc = move.start
+        last = len(move.path) - 1
+        for i, (end, board_loc) in enumerate(zip(move.path, move.targets())):
+            records.append(
+                self._apply(
+                    piece_loc, board_loc, color_p, self.is_king(piece_loc),
+                    i < last
+                )
+            )
+            piece_loc = end
+        return records
+
+    def unmake_move(self, records):
+        """
+        Takes back a move played with make_move.
+
+        Parameters:
+        records (list): the records returned by make_move
+
+        Returns: None
+        """
+        for record in reversed(records):
+            self.undo_move(record)
+
+    def invalidate_move_cache(self):
+        """
+        Throws away all cached moves. Needed after changing
+        board.board_grid directly instead of through _place_piece and
+        _remove_piece.
+        """
+        self._move_cache = None
+        self._dirty = set()
+        self._status = None
+
+    def _update_move_cache(self):
+        """
+        Brings the cached moves of every piece up to date. Only pieces within
+        two diagonal steps of a changed square can have different moves, so
+        only those are recomputed.
+
+        Returns: None
+        """
+        grid = self.board.board_grid
+        if self._move_cache is None:
+            self._move_cache = {}
+            self._capturers = {"LIGHT": set(), "DARK": set()}
+            self._movable = {"LIGHT": set(), "DARK": set()}
+            todo = self.board.pieces_white_set | self.board.pieces_black_set
+        elif self._dirty:
+            near = _neighbourhoods(self.side_len)
+            todo = set()
+            for row, col in self._dirty:
+                todo.update(near[row][col])
+        else:
+            return
+        self._dirty = set()
+        for coords in todo:
+            piece = grid[coords[0]][coords[1]].piece
+            self._capturers["LIGHT"].discard(coords)
+            self._capturers["DARK"].discard(coords)
+            self._movable["LIGHT"].discard(coords)
+            self._movable["DARK"].discard(coords)
+            if piece is None:
+                self._move_cache.pop(coords, None)
+                continue
+            moves = sorted(
+                self.piece_all_moves(coords, piece.color, piece.king)
             )
-            for coords2 in move_lst1:
-                if coords2[2] == "C":
-                    capture = True
-            all_moves_dict[(coords[0], coords[1])] = move_lst1
-        all_moves_dict = {k: v for k, v in all_moves_dict.items() if v}
-        if capture:
-            for key in all_moves_dict.keys():
-                for i, coords2 in enumerate(all_moves_dict[key]):
-                    if coords2[2] == "NC":
-                        all_moves_dict[key][i] = ()
-        for keys, lsts in all_moves_dict.items():
-            lsts = [v for v in lsts if v != ()]
-            all_moves_dict[keys] = lsts
-        all_moves_dict = {k: v for k, v in all_moves_dict.items() if v}
-        return all_moves_dict
+            self._move_cache[coords] = moves
+            if moves:
+                self._movable[piece.color].add(coords)
+            for move in moves:
+                if move[2] == "C":
+                    self._capturers[piece.color].add(coords)
+                    break
 
     def calculate_boardstate(self):
         """
         Calculates the boardstate used for bot implementation
+
+        The pieces' values are kept as a running total in self.score as
+        pieces are placed and removed, so this does not look at the board.
         """
-        boardstate = 0
-        for row, col in self.board.pieces_white_set:
-            if self.board.board_grid[row][col].piece.king:
-                boardstate += 2
-            else:
-                boardstate += 1
-        for row, col in self.board.pieces_black_set:
-            if self.board.board_grid[row][col].piece.king:
-                boardstate -= 2
-            else:
-                boardstate -= 1
         if self.board.winner == "LIGHT":
-            boardstate += 1000
+            return self.score + self.evaluator.WIN
         elif self.board.winner == "DARK":
-            boardstate -= 1000
-        return boardstate
+            return self.score - self.evaluator.WIN
+        return self.score
+
+    def set_evaluator(self, evaluator):
+        """
+        Scores the game with a different evaluator from now on, summing its
+        values of the pieces already on the board.
+
+        Parameters:
+            evaluator (Evaluator): the new evaluator
+
+        Returns: None
+        """
+        self.evaluator = evaluator
+        self._values = evaluator.table(self.side_len)
+        self.score = 0
+        pieces = self.board.pieces_white_set | self.board.pieces_black_set
+        for row, col in pieces:
+            piece = self.board.board_grid[row][col].piece
+            self.score += self._values[(piece.color, piece.king)][
+                row * self.side_len + col
+            ]
+
+    def get_position(self):
+        """
+        Returns everything needed to set up the game in its current position.
+
+        Returns: Position
+        """
+        board = self.board
+        white = board.pieces_white_set
+        pieces = white | board.pieces_black_set
+        return position.Position(
+            self.side_len,
+            tuple(white),
+            tuple(board.pieces_black_set),
+            frozenset(
+                (row, col)
+                for row, col in pieces
+                if board.board_grid[row][col].piece.king
+            ),
+            board.turn,
+            self.moves_since_capture,
+            board.white_draw_offer,
+            board.black_draw_offer,
+        )
+
+    @classmethod
+    def from_position(cls, pos, evaluator=None):
+        """
+        Builds a game in a given position.
+
+        Parameters:
+            pos (Position): the position
+            evaluator (Evaluator or None): None uses material only
+
+        Returns: Checkers
+        """
+        game = cls((pos.side_len - 2) // 2, evaluator=evaluator)
+        grid = game.board.board_grid
+        for row, col in game.board.pieces_white_set:
+            grid[row][col].piece = None
+        for row, col in game.board.pieces_black_set:
+            grid[row][col].piece = None
+        game.board.pieces_white_set = set()
+        game.board.pieces_black_set = set()
+        game.num_light = 0
+        game.num_dark = 0
+        game.zobrist = 0
+        game.score = 0
+        for color, pieces in (("LIGHT", pos.light), ("DARK", pos.dark)):
+            for loc in pieces:
+                game._place_piece(loc, color, loc in pos.kings)
+        game.board.turn = pos.turn
+        game.board.white_draw_offer = pos.white_draw_offer
+        game.board.black_draw_offer = pos.black_draw_offer
+        game.moves_since_capture = pos.moves_since_capture
+        return game
+
+    def to_fen(self):
+        """
+        Returns the position in the text format of position.py.
+
+        Returns: str
+        """
+        return position.to_text(self.get_position())
+
+    @classmethod
+    def from_fen(cls, text, evaluator=None):
+        """
+        Builds a game from a position in the text format of position.py.
+
+        Parameters:
+            text (str): the position
+            evaluator (Evaluator or None): None uses material only
+
+        Returns: Checkers
+        """
+        return cls.from_position(position.from_text(text), evaluator)
+
+    def to_bytes(self):
+        """
+        Returns the position in the binary format of position.py.
+
+        Returns: bytes
+        """
+        return position.to_bytes(self.get_position())
+
+    @classmethod
+    def from_bytes(cls, data, evaluator=None):
+        """
+        Builds a game from a position in the binary format of position.py.
+
+        Parameters:
+            data (bytes): the position
+            evaluator (Evaluator or None): None uses material only
+
+        Returns: Checkers
+        """
+        return cls.from_position(position.from_bytes(data), evaluator)
+
+    def copy(self):
+        """
+        Returns a copy of the game in the same position, with the same
+        evaluator and winner but no listeners. Much cheaper than deepcopy.
+
+        Returns: Checkers
+        """
+        game = self.from_position(self.get_position(), self.evaluator)
+        game.board.winner = self.board.winner
+        return game
+
+    def zobrist_key(self):
+        """
+        Returns the Zobrist hash of the position, including whose turn it is.
+
+        Returns: int
+        """
+        if self.board.turn == "DARK":
+            return self.zobrist ^ TURN_KEY
+        return self.zobrist
+
+    def _zobrist_key(self, loc, color, king):
+        """
+        Returns the Zobrist key of a piece of a given color and king state on
+        the square at loc.
+
+        Returns: int
+        """
+        return self._zobrist_keys[(color, king)][
+            loc[0] * self.side_len + loc[1]
+        ]
 
     def _place_piece(self, loc, color, king=False):
         """
         Places a piece in the location given its coords, color, and king state.
         """
         # input location as (row, column)
-        self.board.board_grid[loc[0]][loc[1]].piece = Checkers_Piece(
-            color, king
-        )
+        self.board.board_grid[loc[0]][loc[1]].piece = PIECES[(color, king)]
+        self.zobrist ^= self._zobrist_key(loc, color, king)
+        self.score += self._values[(color, king)][
+            loc[0] * self.side_len + loc[1]
+        ]
+        if self._move_cache is not None:
+            self._dirty.add(loc)
+        self._status = None
         if color == "LIGHT":
             self.board.pieces_white_set.add((loc))
+            self.num_light += 1
         else:
             self.board.pieces_black_set.add((loc))
-        print(self)
+            self.num_dark += 1
 
     def _remove_piece(self, loc):
         """
@@ -561,12 +1094,103 @@ class Checkers:
         location before using.
         """
         # input location as (row, column)
-        if self.board.board_grid[loc[0]][loc[1]].piece.color == "LIGHT":
+        piece = self.board.board_grid[loc[0]][loc[1]].piece
+        self.zobrist ^= self._zobrist_key(loc, piece.color, piece.king)
+        self.score -= self._values[(piece.color, piece.king)][
+            loc[0] * self.side_len + loc[1]
+        ]
+        if self._move_cache is not None:
+            self._dirty.add(loc)
+        self._status = None
+        if piece.color == "LIGHT":
             self.board.pieces_white_set.remove((loc))
+            self.num_light -= 1
         else:
             self.board.pieces_black_set.remove((loc))
+            self.num_dark -= 1
         self.board.board_grid[loc[0]][loc[1]].piece = None
-        print(self)
+
+
+_DIAGONALS = {}
+_NEIGHBOURHOODS = {}
+
+
+def _diagonals(side_len):
+    """
+    Returns the diagonal moves of every square of a board of a given side
+    length, and the row each color promotes on. Built once per side length
+    and shared by all games.
+
+    Parameters:
+        side_len (int): length of the board
+
+    Returns: dict with
+        "up", "down": list[list[tuple]] indexed by row and column, of
+        (step, land) for the squares one step up (down) the diagonals,
+        east first, where land is the square a jump over step lands on
+        (None if it is off the board)
+        "promotion": dict{str: int}, the promotion row of each color
+    """
+    tables = _DIAGONALS.get(side_len)
+    if tables is None:
+        tables = {"promotion": {"LIGHT": side_len - 1, "DARK": 0}}
+        for name, d_row in (("up", -1), ("down", 1)):
+            grid = []
+            for row in range(side_len):
+                grid.append([])
+                for col in range(side_len):
+                    steps = []
+                    for d_col in (1, -1):
+                        step = (row + d_row, col + d_col)
+                        land = (row + 2 * d_row, col + 2 * d_col)
+                        if not (
+                            0 <= step[0] < side_len
+                            and 0 <= step[1] < side_len
+                        ):
+                            continue
+                        if not (
+                            0 <= land[0] < side_len
+                            and 0 <= land[1] < side_len
+                        ):
+                            land = None
+                        steps.append((step, land))
+                    grid[row].append(tuple(steps))
+            tables[name] = grid
+        _DIAGONALS[side_len] = tables
+    return tables
+
+
+def _neighbourhoods(side_len):
+    """
+    Returns, for every square of a board of a given side length, the squares
+    at most two diagonal steps away from it (including itself). These are the
+    squares whose pieces can have their moves changed by a change to the
+    square. Built once per side length.
+
+    Parameters:
+        side_len (int): length of the board
+
+    Returns: list[list[list[tuple(int, int)]]] indexed by row and column
+    """
+    near = _NEIGHBOURHOODS.get(side_len)
+    if near is None:
+        near = []
+        for row in range(side_len):
+            near.append([])
+            for col in range(side_len):
+                near[row].append(
+                    [
+                        (row + i * d_row, col + i * d_col)
+                        for i in (1, 2)
+                        for d_row in (-1, 1)
+                        for d_col in (-1, 1)
+                        if 0 <= row + i * d_row < side_len
+                        and 0 <= col + i * d_col < side_len
+                    ]
+                    + [(row, col)]
+                )
+        _NEIGHBOURHOODS[side_len] = near
+    return near
 
 
 def make_test_board():
@@ -581,16 +1205,21 @@ def make_test_board():
     return x
 
 
-def clear_board():
+def clear_board(n=3):
     """
     Creates clear board
     """
-    x = Checkers()
+    x = Checkers(n)
     for i in range(x.board.rows):
         for j in range(x.board.columns):
             x.board.board_grid[i][j].piece = None
     x.board.pieces_white_set = set()
     x.board.pieces_black_set = set()
+    x.num_light = 0
+    x.num_dark = 0
+    x.zobrist = 0
+    x.score = 0
+    x.invalidate_move_cache()
     return x
 
 
@@ -607,13 +1236,17 @@ def winner_check():
 
 class Checkers_Piece:
     """
-    Class for representing checkers pieces.
+    Class for representing checkers pieces. Pieces can not be changed, so
+    the boards share the four pieces in PIECES instead of creating new ones
+    (a promotion replaces the man with the king of its color).
 
     Attriubutes:
     color (str): color of the piece
     king (bool): determines whether the piece is a king
     """
 
+    __slots__ = ("color", "king")
+
     def __init__(self, color_p, king=False):
         """
         Constructor
@@ -624,8 +1257,20 @@ class Checkers_Piece:
 
         Initializes a regular or king piece.
         """
-        self.color = color_p
-        self.king = king
+        object.__setattr__(self, "color", color_p)
+        object.__setattr__(self, "king", king)
+
+    def __setattr__(self, name, value):
+        """
+        Pieces are shared between boards and can not be changed.
+        """
+        raise AttributeError("Checkers_Piece can not be changed")
+
+    def __reduce__(self):
+        """
+        Pickles a piece as the shared piece of its color and king state.
+        """
+        return (_shared_piece, (self.color, self.king))
 
     def __str__(self) -> str:
         """
@@ -642,3 +1287,196 @@ class Checkers_Piece:
         elif self.color == "LIGHT":
             ret_str = Fore.WHITE + "\033[4mW\033[0m" + Fore.RESET
         return ret_str
+
+
+# the shared pieces, by color and king state
+PIECES = {
+    (color, king): Checkers_Piece(color, king)
+    for color in ("LIGHT", "DARK")
+    for king in (False, True)
+}
+
+
+def _shared_piece(color, king):
+    """
+    Returns the shared piece of a color and king state.
+    """
+    return PIECES[(color, king)]
+
+
+class MoveRecord:
+    """
+    Class for recording a single move made with Checkers.apply_move, holding
+    everything needed to undo it.
+
+    Attributes:
+    piece_loc (tuple(int, int)): where the moved piece started
+    board_loc (tuple(int, int)): where the moved piece ended up
+    color (str): color of the moved piece
+    king (bool): whether the moved piece was a king before the move
+    promoted (bool): whether the move turned the piece into a king
+    captured (None or tuple(tuple(int, int), Checkers_Piece)): location and
+    piece that was captured, None if the move was not a capture
+    turn (str): whose turn it was before the move
+    moves_since_capture (int): moves since capture before the move
+    winner (None or str): winner of the board before the move
+    status (None or tuple(str, str)): the game's cached check_winner status
+    before the move
+    result (str): "Move Piece Again" or "End Turn"
+    """
+
+    __slots__ = (
+        "piece_loc", "board_loc", "color", "king", "promoted", "captured",
+        "turn", "moves_since_capture", "winner", "status", "result",
+    )
+
+    def __init__(
+        self, piece_loc, board_loc, color, king, turn, moves_since_capture,
+        winner
+    ):
+        """
+        Constructor
+
+        Parameters:
+            piece_loc (tuple(int, int)): where the moved piece started
+            board_loc (tuple(int, int)): where the moved piece ended up
+            color (str): color of the moved piece
+            king (bool): whether the moved piece was a king before the move
+            turn (str): whose turn it was before the move
+            moves_since_capture (int): moves since capture before the move
+            winner (None or str): winner of the board before the move
+
+        Initializes a record of a non-capturing move without a promotion.
+        """
+        self.piece_loc = piece_loc
+        self.board_loc = board_loc
+        self.color = color
+        self.king = king
+        self.promoted = False
+        self.captured = None
+        self.turn = turn
+        self.moves_since_capture = moves_since_capture
+        self.winner = winner
+        self.status = None
+        self.result = None
+
+
+class Move(NamedTuple):
+    """
+    A whole turn of one piece: a single step, a single capture, or a
+    multi-jump capture sequence.
+
+    Attributes:
+    start (tuple(int, int)): where the piece starts
+    path (tuple(tuple(int, int))): every square the piece lands on, in
+    order, ending with where it stops
+    captured (tuple(tuple(int, int))): squares of the captured pieces, in
+    the order they are captured, empty if the move is not a capture
+    """
+
+    start: tuple
+    path: tuple
+    captured: tuple
+
+    @property
+    def end(self):
+        """
+        Square the piece stops on, returns tuple(int, int)
+        """
+        return self.path[-1]
+
+    def targets(self):
+        """
+        Returns the jumps of the move in the format of move_piece.
+
+        Returns: list[tuple(int, int, str)]
+        """
+        if self.captured:
+            return [(row, col, "C") for row, col in self.path]
+        return [(row, col, "NC") for row, col in self.path]
+
+
+class GameEvent:
+    """
+    Class for the events a game sends to its listeners.
+
+    Attributes:
+    kind (str): "move", "capture", "promotion", "move_again", "end_turn",
+    "illegal" or "undo"
+    color (str): color of the player who moved
+    start (None or tuple): square a piece moved from ("move", "illegal",
+    "undo"), was captured on ("capture"), was promoted on ("promotion") or
+    has to move again from ("move_again")
+    end (None or tuple): square a piece moved to ("move", "illegal", "undo")
+    """
+
+    __slots__ = ("kind", "color", "start", "end")
+
+    def __init__(self, kind, color, start=None, end=None):
+        """
+        Constructor
+
+        Parameters:
+            kind (str): what happened
+            color (str): color of the player who moved
+            start (None or tuple): first square of the event
+            end (None or tuple): second square of the event
+
+        Initializes an event.
+        """
+        self.kind = kind
+        self.color = color
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        """
+        repr method, returns str
+        """
+        return (
+            f"GameEvent({self.kind!r}, {self.color!r}, "
+            f"{self.start}, {self.end})"
+        )
+
+
+class TerminalRenderer:
+    """
+    Listener that prints a game to the terminal.
+
+    Attributes:
+    game (Checkers): the game to print
+    verbosity (int): 1 prints messages about moves, 2 also prints the board
+    after every move
+    """
+
+    def __init__(self, game, verbosity=2):
+        """
+        Constructor
+
+        Parameters:
+            game (Checkers): the game to print
+            verbosity (int): how much to print
+
+        Initializes a renderer, which still has to be subscribed to the game.
+        """
+        self.game = game
+        self.verbosity = verbosity
+
+    def __call__(self, event):
+        """
+        Prints an event.
+
+        Parameters:
+            event (GameEvent): the event to print
+
+        Returns: None
+        """
+        if event.kind == "illegal":
+            print("Move Not Legal")
+        elif event.kind == "move_again" or event.kind == "end_turn":
+            if self.verbosity >= 2:
+                print(self.game)
+            if event.kind == "move_again":
+                print("Move Piece Again")
+            else:
+                print("End Turn")
@@ -0,0 +1,140 @@
+"""
+Evaluators that score checkers positions for the bots
+
+A position's score is the sum of a value for every piece on the board, from
+light's point of view (light pieces count up, dark pieces count down). Every
+evaluator precomputes a table of those values for each (color, king, square)
+once per board size, so Checkers and BitboardCheckers can keep the score as
+a running total: placing or removing a piece only adds or subtracts one
+table entry, and evaluating a leaf of the search costs nothing.
+
+x = Checkers(3, evaluator=PositionalEvaluator())
+# Creates a game scored by material, advancement and centralization
+x.calculate_boardstate()
+# Returns the running total, plus or minus WIN once the game is won
+
+New terms are added by subclassing Evaluator and overriding piece_value.
+Terms that do not depend on a single piece alone (mobility, structure) can
+not be kept as a running total and are not supported.
+"""
+
+
+class Evaluator:
+    """
+    Base class of the evaluators. Scores a piece by its material only: one
+    for a man, two for a king.
+
+    Attributes:
+    WIN (int): score of a won position, larger than any sum of pieces
+    ASPIRATION (int): how far on either side of the value of the previous
+    depth a PVS bot expects the value of the next depth to be, about half
+    a man (but at least 1, as scores are whole numbers)
+    """
+
+    WIN = 1000
+    ASPIRATION = 1
+
+    def __init__(self):
+        """
+        Constructor
+
+        Initializes an evaluator with no tables built yet.
+        """
+        self._tables = {}
+
+    def piece_value(self, advance, col, king, side_len):
+        """
+        Returns the value of one piece for its own side. Pieces are
+        described relative to their own side, so light and dark pieces are
+        scored the same way.
+
+        Parameters:
+            advance (int): rows the piece is from its own back row
+            col (int): column of the piece
+            king (bool): if the piece is a king
+            side_len (int): length of the board
+
+        Returns: int
+        """
+        if king:
+            return 2
+        return 1
+
+    def table(self, side_len):
+        """
+        Returns the value of every piece on a board of a given side length,
+        positive for light and negative for dark. Built once per side
+        length.
+
+        Parameters:
+            side_len (int): length of the board
+
+        Returns: dict{tuple(str, bool): list[int]} indexed by
+        row * side_len + column
+        """
+        table = self._tables.get(side_len)
+        if table is None:
+            table = {}
+            for king in (False, True):
+                light = []
+                dark = []
+                for row in range(side_len):
+                    for col in range(side_len):
+                        light.append(
+                            self.piece_value(row, col, king, side_len)
+                        )
+                        dark.append(
+                            -self.piece_value(
+                                side_len - 1 - row, col, king, side_len
+                            )
+                        )
+                table[("LIGHT", king)] = light
+                table[("DARK", king)] = dark
+            self._tables[side_len] = table
+        return table
+
+
+class MaterialEvaluator(Evaluator):
+    """
+    Scores a position by material only. The default evaluator of Checkers
+    and BitboardCheckers.
+    """
+
+
+class PositionalEvaluator(Evaluator):
+    """
+    Scores men by how far they have advanced and kings by how close they
+    are to the center, on top of their material. Men left on their own back
+    row get a bonus for guarding it against promotions.
+    """
+
+    WIN = 10**6
+    ASPIRATION = 5
+    MAN = 10
+    KING = 25
+    BACK_ROW = 2
+
+    def piece_value(self, advance, col, king, side_len):
+        """
+        Returns the value of one piece for its own side.
+
+        Parameters: same as Evaluator.piece_value
+
+        Returns: int
+        """
+        if king:
+            center = (side_len - 1) / 2
+            dist = max(abs(advance - center), abs(col - center))
+            return self.KING + int(side_len / 2 - dist)
+        if advance == 0:
+            return self.MAN + self.BACK_ROW
+        return self.MAN + advance
+
+
+DEFAULT_EVALUATOR = MaterialEvaluator()
+
+# evaluators by the names used on the command line
+EVALUATORS = {
+    "material": MaterialEvaluator,
+    "positional": PositionalEvaluator,
+}
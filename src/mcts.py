@@ -0,0 +1,318 @@
+"""
+Monte Carlo Tree Search bot, an anytime alternative to the minimax Bot
+
+MCTSBot builds a tree of the positions it has looked at. Every iteration
+walks down the tree choosing moves by UCT (the win rate of a move plus a
+bonus for moves tried less often), adds one new position, plays a random
+game from it to the end and counts the result for every position on the
+way. It plays the move tried most often. More iterations give better moves,
+so the bot can be given any number of iterations or any amount of time, and
+it keeps the part of the tree below the position it is given next, so the
+work of one move carries over to the next.
+
+bot = MCTSBot("LIGHT", iterations=2000)
+# Creates a bot that runs 2000 iterations per move
+bot = MCTSBot("DARK", iterations=None, time_limit=1.0)
+# Creates a bot that runs as many iterations as fit in a second
+bot.get_move(game)
+# Returns the bot's Move, like Bot.get_move
+
+Random games are played on a BitboardCheckers copy of the game by taking
+moves back, with no listeners, so they print nothing and copy nothing.
+"""
+import math
+import random
+import time
+
+from bitboard import BitboardCheckers
+from simulate import DRAW_MOVES
+from stats import SearchStats
+
+
+class Node:
+    """
+    A position in the tree of an MCTSBot.
+
+    Attributes:
+    move (None or Move): the move that led to the position from its parent
+    color (None or str): color of the player who played move
+    key (int): Zobrist key of the position
+    parent (None or Node): the position before move
+    children (list[Node]): positions after the moves tried so far
+    untried (None or list[Move]): moves not tried yet, None until the
+    position is first reached
+    visits (int): iterations that went through the position
+    wins (float): wins of color in those iterations, draws counting half
+    result (None or str): winner of the game if it is over in the position
+    ("LIGHT", "DARK" or "DRAW"), as check_winner decides it
+    """
+
+    __slots__ = (
+        "move", "color", "key", "parent", "children", "untried", "visits",
+        "wins", "result",
+    )
+
+    def __init__(self, move, color, key, parent):
+        """
+        Constructor
+
+        Initializes a position that no iteration has gone through yet.
+        """
+        self.move = move
+        self.color = color
+        self.key = key
+        self.parent = parent
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.wins = 0.0
+        self.result = None
+
+
+class MCTSBot:
+    """
+    Bot that picks its moves by Monte Carlo Tree Search. Has the same
+    get_move, move and close methods as Bot, so they can play each other.
+    """
+
+    def __init__(
+        self,
+        color,
+        iterations=1000,
+        time_limit=None,
+        exploration=1.4,
+        reuse=True,
+    ):
+        """
+        Constructor
+        Attributes:
+        color(str): either "LIGHT" or "DARK"
+        iterations(None or int): iterations per move
+        time_limit(None or float): seconds the bot may spend on a move
+        exploration(float): weight of the UCT bonus of moves tried less
+        often
+        reuse(bool): if the bot keeps its tree between moves
+        nodes(int): number of iterations run so far
+
+        Parameters:
+        color(str): which side the bot will play on
+        iterations(None or int): the most iterations run per move, None for
+        no limit (time_limit must then be given)
+        time_limit(None or float): if given, the bot stops after this many
+        seconds even if it has iterations left
+        exploration(float): the UCT constant, higher explores more
+        reuse(bool): keep the tree below the position of the next move
+
+        Initializes a bot with an empty tree
+        """
+        assert color == "LIGHT" or color == "DARK"
+        assert iterations is not None or time_limit is not None
+        self.color = color
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.reuse = reuse
+        self.nodes = 0
+        self._root = None
+
+    def get_move(self, new_board_state, stats=False):
+        """
+        gets a move recommendation based on board state
+
+        Input:
+        - new_board_state(Checkers or BitboardCheckers): the game to get a
+        move from, left unchanged
+        - stats(bool): also return statistics about the search
+
+        Output:
+        - Move, or tuple(Move, SearchStats) if stats is True
+        """
+        start = time.perf_counter()
+        if isinstance(new_board_state, BitboardCheckers):
+            game = new_board_state.copy()
+        else:
+            game = BitboardCheckers.from_checkers(new_board_state)
+        game.listeners = []
+        root = self._find_root(game)
+        search_stats = SearchStats() if stats else None
+        deadline = None
+        if self.time_limit is not None:
+            deadline = start + self.time_limit
+        done = 0
+        while self.iterations is None or done < self.iterations:
+            # the first iteration always runs, so the root has a child
+            if (
+                done
+                and deadline is not None
+                and time.perf_counter() > deadline
+            ):
+                break
+            self._iterate(game, root, search_stats)
+            done += 1
+            # a position with a single move needs no search
+            if root.untried == [] and len(root.children) == 1:
+                break
+        self.nodes += done
+        best = max(root.children, key=lambda child: child.visits)
+        if self.reuse:
+            self._root = best
+            best.parent = None
+        if not stats:
+            return best.move
+        search_stats.searches = 1
+        search_stats.nodes = done
+        search_stats.total_time = time.perf_counter() - start
+        node = best
+        while node is not None:
+            search_stats.pv.append(node.move)
+            node = max(
+                node.children, key=lambda child: child.visits, default=None
+            )
+        return best.move, search_stats
+
+    def _find_root(self, game):
+        """
+        Returns the node of the game's position: the node kept from the last
+        move or one of its children (the opponent's reply) if the position
+        is in the tree, otherwise a new node.
+        """
+        key = game.zobrist_key()
+        kept = self._root
+        if kept is not None:
+            for node in [kept] + kept.children:
+                if node.key == key:
+                    node.parent = None
+                    node.move = None
+                    return node
+        self._root = None
+        return Node(None, None, key, None)
+
+    def _iterate(self, game, root, stats):
+        """
+        Runs one iteration from the root: selection, expansion, a random
+        game and backing up its result. The game is left unchanged.
+        """
+        records = []
+        node = root
+        try:
+            # selection: follow UCT while every move of a node was tried
+            while node.untried == [] and node.children:
+                node = self._select(node)
+                records.append(game.make_move_unchecked(node.move))
+            # expansion: add one untried move of the node
+            if node.untried is None:
+                self._expand(game, node, stats)
+            if node.untried:
+                move = node.untried.pop()
+                color = game.board.turn
+                records.append(game.make_move_unchecked(move))
+                child = Node(move, color, game.zobrist_key(), node)
+                node.children.append(child)
+                node = child
+                self._expand(game, node, stats)
+            if stats is not None:
+                stats.leaves += 1
+                stats.depth = max(stats.depth, len(records))
+            # a finished game needs no random game to know its result
+            winner = node.result
+            if winner is None:
+                winner = self._rollout(game)
+        finally:
+            for move_records in reversed(records):
+                game.unmake_move(move_records)
+        # backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner == "DRAW":
+                node.wins += 0.5
+            elif winner == node.color:
+                node.wins += 1
+            node = node.parent
+
+    def _expand(self, game, node, stats):
+        """
+        Finds the moves of a node reached for the first time, or its result
+        if check_winner finds the game over there.
+        """
+        node.untried = []
+        if game.check_winner() == "No Winner":
+            node.untried = game.legal_moves(game.board.turn)
+            random.shuffle(node.untried)
+        else:
+            node.result = game.board.winner
+        if stats is not None:
+            stats.expanded += 1
+            stats.children += len(node.untried)
+
+    def _select(self, node):
+        """
+        Returns the child of a node with the highest UCT value.
+        """
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        best = None
+        best_value = -1.0
+        for child in node.children:
+            value = child.wins / child.visits + exploration * math.sqrt(
+                log_visits / child.visits
+            )
+            if value > best_value:
+                best = child
+                best_value = value
+        return best
+
+    def _rollout(self, game):
+        """
+        Plays random moves until the game is over and returns the winner
+        ("LIGHT", "DARK" or "DRAW"). The game is left unchanged.
+
+        To save generating the moves of both players every move, a player
+        loses when they have no moves on their own turn, which is when
+        check_winner almost always ends the game anyway.
+        """
+        records = []
+        try:
+            while True:
+                turn = game.board.turn
+                moves = game.legal_moves(turn)
+                if not moves:
+                    return "DARK" if turn == "LIGHT" else "LIGHT"
+                if game.moves_since_capture >= DRAW_MOVES:
+                    return "DRAW"
+                records.append(
+                    game.make_move_unchecked(random.choice(moves))
+                )
+        finally:
+            for move_records in reversed(records):
+                game.unmake_move(move_records)
+
+    def close(self):
+        """
+        Frees the bot's tree.
+        """
+        self._root = None
+
+    def move(self, new_board_state, stats=None):
+        """
+        actively changes the board state on game object in place
+        Input:
+        - new_board_state(Checkers): the gave to be moved
+        - stats(None or SearchStats): if given, the statistics of the search
+        for the move are added to it
+
+        Output:
+        - Checkers obj: the changed game
+        """
+        if new_board_state.board.winner is not None:
+            print("There is a winner")
+            return new_board_state
+        elif new_board_state.board.turn != self.color:
+            print("It is not our turn")
+        else:
+            if stats is None:
+                move = self.get_move(new_board_state)
+            else:
+                move, move_stats = self.get_move(new_board_state, stats=True)
+                stats.merge(move_stats)
+            new_board_state.make_move_unchecked(move)
+            return new_board_state
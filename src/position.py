@@ -0,0 +1,247 @@
+"""
+Compact text and binary formats for checkers positions
+
+A Position holds everything about a position that affects how the game goes
+on: the pieces, the kings, whose turn it is, moves since the last capture
+and the draw offers. Checkers and BitboardCheckers convert to and from
+Positions, and Positions convert to and from text and bytes in time linear
+in the size of the board.
+
+The text format follows the FEN of PDN (Portable Draughts Notation). The
+playable squares are numbered 1, 2, ... row by row from the top left, and
+the text lists the side to move, then the light (W) and dark (B) pieces by
+square number with K in front of kings, then the side length (S), the moves
+since capture (M) and the draw offers (D):
+
+W:W1,2,K3:B30,31,32:S8:M0:D-
+
+The binary format is fixed-width for each board size: one byte each for the
+side length, the turn and draw offers, and the moves since capture, then a
+bitset of the light pieces, one of the dark pieces and one of the kings, with
+one bit per playable square.
+
+x = Checkers()
+x.to_fen()
+# Returns 'W:W1,2,...,12:B21,...,32:S8:M0:D-'
+y = Checkers.from_fen(x.to_fen())
+# Creates a game in the same position
+x.to_bytes()
+# Returns the position as 15 bytes
+z = x.copy()
+# Copies the game through its Position
+"""
+from typing import NamedTuple
+
+
+class Position(NamedTuple):
+    """
+    Everything needed to set up a position.
+
+    Attributes:
+    side_len (int): length of the board
+    light (tuple(tuple(int, int))): squares of the light pieces
+    dark (tuple(tuple(int, int))): squares of the dark pieces
+    kings (frozenset(tuple(int, int))): squares of the kings of both colors
+    turn (str): color of the player to move
+    moves_since_capture (int): moves since capture
+    white_draw_offer (bool): whether light offers a draw
+    black_draw_offer (bool): whether dark offers a draw
+    """
+
+    side_len: int
+    light: tuple
+    dark: tuple
+    kings: frozenset
+    turn: str = "LIGHT"
+    moves_since_capture: int = 0
+    white_draw_offer: bool = False
+    black_draw_offer: bool = False
+
+
+def square_number(loc, side_len):
+    """
+    Returns the number of a playable square, counting from 1 row by row.
+
+    Parameters:
+        loc (tuple(int, int)): coordinates of the square
+        side_len (int): length of the board
+
+    Returns: int
+    """
+    return loc[0] * (side_len // 2) + loc[1] // 2 + 1
+
+
+def square_coords(number, side_len):
+    """
+    Returns the coordinates of a playable square from its number.
+
+    Parameters:
+        number (int): number of the square, from 1
+        side_len (int): length of the board
+
+    Returns: tuple(int, int)
+    """
+    row, col = divmod(number - 1, side_len // 2)
+    return (row, 2 * col + (row + 1) % 2)
+
+
+def to_text(position):
+    """
+    Writes a Position in the text format.
+
+    Parameters:
+        position (Position): the position
+
+    Returns: str
+    """
+    side = position.side_len
+    fields = ["W" if position.turn == "LIGHT" else "B"]
+    for letter, pieces in (("W", position.light), ("B", position.dark)):
+        fields.append(
+            letter
+            + ",".join(
+                ("K" if loc in position.kings else "")
+                + str(square_number(loc, side))
+                for loc in sorted(pieces)
+            )
+        )
+    offers = ""
+    if position.white_draw_offer:
+        offers += "W"
+    if position.black_draw_offer:
+        offers += "B"
+    fields.append(f"S{side}")
+    fields.append(f"M{position.moves_since_capture}")
+    fields.append(f"D{offers or '-'}")
+    return ":".join(fields)
+
+
+def from_text(text):
+    """
+    Reads a Position written in the text format.
+
+    Parameters:
+        text (str): the position
+
+    Returns: Position
+
+    Raises: ValueError if the text is not a valid position
+    """
+    fields = text.strip().split(":")
+    if fields[0] not in ("W", "B"):
+        raise ValueError(f"unknown side to move in {text!r}")
+    turn = "LIGHT" if fields[0] == "W" else "DARK"
+    side = 8
+    moves_since_capture = 0
+    offers = "-"
+    pieces = {"W": [], "B": []}
+    for field in fields[1:]:
+        letter, value = field[:1], field[1:]
+        if letter in pieces:
+            pieces[letter] = [p for p in value.split(",") if p]
+        elif letter == "S":
+            side = int(value)
+        elif letter == "M":
+            moves_since_capture = int(value)
+        elif letter == "D":
+            offers = value
+        else:
+            raise ValueError(f"unknown field {field!r} in {text!r}")
+    if side < 4 or side % 2:
+        raise ValueError(f"bad side length in {text!r}")
+    squares = side * side // 2
+    kings = set()
+    colors = {}
+    for letter, numbers in pieces.items():
+        colors[letter] = []
+        for number in numbers:
+            king = number[:1] == "K"
+            if king:
+                number = number[1:]
+            if not number.isdigit() or not 1 <= int(number) <= squares:
+                raise ValueError(f"bad square {number!r} in {text!r}")
+            loc = square_coords(int(number), side)
+            colors[letter].append(loc)
+            if king:
+                kings.add(loc)
+    return Position(
+        side,
+        tuple(colors["W"]),
+        tuple(colors["B"]),
+        frozenset(kings),
+        turn,
+        moves_since_capture,
+        "W" in offers,
+        "B" in offers,
+    )
+
+
+def to_bytes(position):
+    """
+    Writes a Position in the binary format.
+
+    Parameters:
+        position (Position): the position
+
+    Returns: bytes
+    """
+    side = position.side_len
+    width = (side * side // 2 + 7) // 8
+    masks = [0, 0, 0]
+    for i, pieces in enumerate((position.light, position.dark)):
+        for loc in pieces:
+            bit = 1 << (square_number(loc, side) - 1)
+            masks[i] |= bit
+            if loc in position.kings:
+                masks[2] |= bit
+    flags = (
+        (position.turn == "DARK")
+        | position.white_draw_offer << 1
+        | position.black_draw_offer << 2
+    )
+    header = bytes(
+        (side, flags, min(position.moves_since_capture, 255))
+    )
+    return header + b"".join(mask.to_bytes(width, "little") for mask in masks)
+
+
+def from_bytes(data):
+    """
+    Reads a Position written in the binary format.
+
+    Parameters:
+        data (bytes): the position
+
+    Returns: Position
+
+    Raises: ValueError if data is not a valid position
+    """
+    if len(data) < 3:
+        raise ValueError("position is too short")
+    side, flags, moves_since_capture = data[0], data[1], data[2]
+    width = (side * side // 2 + 7) // 8
+    if len(data) != 3 + 3 * width:
+        raise ValueError(f"position of side {side} must be {3 + 3 * width} "
+                         f"bytes, not {len(data)}")
+    light, dark, kings = (
+        int.from_bytes(data[3 + i * width:3 + (i + 1) * width], "little")
+        for i in range(3)
+    )
+    squares = {}
+    for name, mask in (("light", light), ("dark", dark), ("kings", kings)):
+        locs = []
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            locs.append(square_coords(bit.bit_length(), side))
+        squares[name] = locs
+    return Position(
+        side,
+        tuple(squares["light"]),
+        tuple(squares["dark"]),
+        frozenset(squares["kings"]),
+        "DARK" if flags & 1 else "LIGHT",
+        moves_since_capture,
+        bool(flags & 2),
+        bool(flags & 4),
+    )
@@ -0,0 +1,297 @@
+"""
+Game records of bot_v_bot, written as PDN or as JSON lines
+
+A GameWriter listens to a game and writes every move to a text file as soon
+as it has been played. Squares are numbered as in position.py, and a move is
+written as its squares joined by "-", or by "x" for captures (every landing
+square of a multi-jump is written). PDN files get the moves one by one, so
+the writer only holds the move being played. JSON lines files get one line
+per game, written when the game ends, so the writer holds the moves of one
+game.
+
+with open("games.pdn", "a", buffering=1 << 16) as file:
+    writer = GameWriter(file)
+    writer.start(game, {"White": "Bot1", "Black": "Bot2"})
+    # ... play the game ...
+    writer.finish(game, game.check_winner())
+
+for record in read_games("games.pdn"):
+    for game in replay(record):
+        # game is the same Checkers object after every move
+        print(game.to_fen())
+
+read_games reads one game at a time, so files of any size can be read.
+"""
+import json
+import re
+from typing import NamedTuple
+
+from checkers import Checkers
+from position import square_number
+
+# PDN result tokens of the results of check_winner
+RESULTS = {
+    "White Wins": "1-0",
+    "Black Wins": "0-1",
+    "DRAW": "1/2-1/2",
+}
+UNFINISHED = "*"
+
+_TAG = re.compile(r'\[(\w+)\s+"(.*)"\]')
+_MOVE_NUMBER = re.compile(r"\d+\.(\.\.)?$")
+
+
+class GameRecord(NamedTuple):
+    """
+    One game read from a record file.
+
+    Attributes:
+    headers (dict[str, str]): the tags of the game, including its starting
+    position as "FEN"
+    moves (list[str]): the moves, like "9-13" or "22x15x24"
+    result (str): "1-0", "0-1", "1/2-1/2" or "*"
+    """
+
+    headers: dict
+    moves: list
+    result: str
+
+
+class GameWriter:
+    """
+    Writes the moves of games to a text file as they are played. Is a
+    listener of the game it records (see Checkers.subscribe).
+
+    Attributes:
+    file (file): the text file written to
+    fmt (str): "pdn" or "jsonl"
+    line_len (int): longest line of PDN move text
+    """
+
+    def __init__(self, file, fmt="pdn", line_len=79):
+        """
+        Constructor
+
+        Parameters:
+            file (file): text file to write to, opened for appending
+            fmt (str): "pdn" or "jsonl"
+            line_len (int): longest line of PDN move text
+
+        Initializes a writer that is not recording a game.
+        """
+        if fmt not in ("pdn", "jsonl"):
+            raise ValueError(f"unknown record format {fmt!r}")
+        self.file = file
+        self.fmt = fmt
+        self.line_len = line_len
+        self._side_len = None
+        self._squares = []
+        self._capture = False
+        self._plies = 0
+        self._column = 0
+        self._headers = None
+        self._moves = None
+
+    def start(self, game, headers):
+        """
+        Starts recording a game from its current position.
+
+        Parameters:
+            game (Checkers or BitboardCheckers): the game to record
+            headers (dict[str, str]): tags of the game, "FEN" is added
+
+        Returns: None
+        """
+        headers = dict(headers)
+        headers["FEN"] = game.to_fen()
+        self._side_len = game.side_len
+        self._squares = []
+        self._capture = False
+        self._plies = 0 if game.board.turn == "LIGHT" else 1
+        self._column = 0
+        if self.fmt == "pdn":
+            for tag, value in headers.items():
+                self.file.write(f'[{tag} "{value}"]\n')
+        else:
+            self._headers = headers
+            self._moves = []
+        game.subscribe(self)
+
+    def __call__(self, event):
+        """
+        Adds an event of the recorded game to the move being played, and
+        writes the move once the turn ends.
+
+        Parameters:
+            event (GameEvent): the event
+
+        Returns: None
+        """
+        if event.kind == "move":
+            if not self._squares:
+                self._squares.append(event.start)
+            self._squares.append(event.end)
+        elif event.kind == "capture":
+            self._capture = True
+        elif event.kind == "end_turn" and self._squares:
+            sep = "x" if self._capture else "-"
+            move = sep.join(
+                str(square_number(loc, self._side_len))
+                for loc in self._squares
+            )
+            self._squares = []
+            self._capture = False
+            if self.fmt == "pdn":
+                if self._plies % 2 == 0:
+                    self._write_token(f"{self._plies // 2 + 1}.")
+                elif self._column == 0:
+                    self._write_token(f"{self._plies // 2 + 1}...")
+                self._write_token(move)
+            else:
+                self._moves.append(move)
+            self._plies += 1
+
+    def finish(self, game, result):
+        """
+        Stops recording a game and writes its result.
+
+        Parameters:
+            game (Checkers or BitboardCheckers): the recorded game
+            result (str): result of check_winner, anything else is written
+            as unfinished
+
+        Returns: None
+        """
+        game.unsubscribe(self)
+        result = RESULTS.get(result, UNFINISHED)
+        if self.fmt == "pdn":
+            self._write_token(result)
+            self.file.write("\n\n")
+        else:
+            record = {
+                "headers": self._headers,
+                "moves": self._moves,
+                "result": result,
+            }
+            self.file.write(json.dumps(record) + "\n")
+            self._headers = None
+            self._moves = None
+
+    def _write_token(self, token):
+        """
+        Writes one token of PDN move text, starting a new line when the
+        current one is full.
+        """
+        if self._column == 0:
+            self.file.write(token)
+            self._column = len(token)
+        elif self._column + 1 + len(token) > self.line_len:
+            self.file.write("\n" + token)
+            self._column = len(token)
+        else:
+            self.file.write(" " + token)
+            self._column += 1 + len(token)
+
+
+def read_games(path):
+    """
+    Reads the games of a record file one at a time. Files ending in .jsonl
+    are read as JSON lines, others as PDN.
+
+    Parameters:
+        path (str): the file
+
+    Returns: iterator of GameRecord
+    """
+    with open(path) as file:
+        if path.endswith(".jsonl"):
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield GameRecord(
+                        record["headers"], record["moves"], record["result"]
+                    )
+        else:
+            yield from _read_pdn(file)
+
+
+def _read_pdn(file):
+    """
+    Reads the games of a PDN file one at a time. Comments and variations are
+    not supported.
+    """
+    headers = {}
+    moves = []
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        match = _TAG.match(line)
+        if match:
+            headers[match.group(1)] = match.group(2)
+            continue
+        for token in line.split():
+            if token in RESULTS.values() or token == UNFINISHED:
+                yield GameRecord(headers, moves, token)
+                headers = {}
+                moves = []
+            elif not _MOVE_NUMBER.match(token):
+                moves.append(token)
+    if moves:
+        yield GameRecord(headers, moves, UNFINISHED)
+
+
+def replay(record, game_class=Checkers):
+    """
+    Replays a game record, yielding the game before the first move and after
+    every move. The same game object is yielded every time.
+
+    Parameters:
+        record (GameRecord): the game
+        game_class (type): Checkers or BitboardCheckers
+
+    Returns: iterator of Checkers or BitboardCheckers
+
+    Raises: ValueError if a move is not legal
+    """
+    if "FEN" in record.headers:
+        game = game_class.from_fen(record.headers["FEN"])
+    else:
+        game = game_class()
+    yield game
+    for text in record.moves:
+        game.make_move_unchecked(find_move(game, text))
+        yield game
+
+
+def find_move(game, text):
+    """
+    Returns the legal Move of the player to move written as text. A
+    multi-jump can also be written with only its first and last squares,
+    if that is not ambiguous.
+
+    Parameters:
+        game (Checkers or BitboardCheckers): the game
+        text (str): the move, like "9-13" or "22x15x24"
+
+    Returns: Move
+
+    Raises: ValueError if no legal move (or more than one) matches
+    """
+    try:
+        squares = [int(square) for square in re.split("[-x]", text)]
+    except ValueError:
+        raise ValueError(f"bad move {text!r}") from None
+    found = []
+    for move in game.legal_moves(game.board.turn):
+        numbers = [
+            square_number(loc, game.side_len)
+            for loc in (move.start,) + move.path
+        ]
+        if numbers == squares:
+            return move
+        if len(squares) == 2 and numbers[::len(numbers) - 1] == squares:
+            found.append(move)
+    if len(found) != 1:
+        raise ValueError(f"{text!r} is not a legal move")
+    return found[0]
@@ -0,0 +1,367 @@
+"""
+Batched random-game simulator using NumPy arrays
+
+Plays thousands of random games at once. All positions are kept in one
+array and every step generates the moves of all of them with a few
+vectorized operations, then plays one random jump in every game, so the
+games finish in lockstep. Each game draws its random numbers from its own
+splitmix64 generator, seeded with seed + the number of the game, so a game's
+result does not depend on which other games it is simulated with.
+
+The rules are the same as Checkers, including how check_winner decides a
+game: light loses as soon as it has no moves (even on dark's turn), then
+dark, and the game is a draw after 40 moves without a capture. Moves are
+picked like Bot.random_move: a random piece that can move, then a random
+move of that piece. A multi-jump picks its jumps one at a time, so when a
+piece has several capture sequences, sequences that branch late are a
+little less likely than with random_move.
+
+winners, plies = simulate(100000, play_len=3, seed=0)
+# Returns arrays of the winner of every game (1 light, -1 dark, 0 draw)
+# and how many moves it lasted
+sim = Simulator(3)
+boards, turns, since_capture = sim.encode([game1, game2])
+winners, plies = sim.play(boards, turns, since_capture, seeds=[7, 8])
+# Plays random games on from the positions of Checkers games (rollouts)
+"""
+import time
+
+import click
+import numpy as np
+
+from checkers import Checkers
+
+# values of the squares of a board array
+EMPTY = 0
+LIGHT_MAN = 1
+LIGHT_KING = 2
+DARK_MAN = -1
+DARK_KING = -2
+# the padding around the board, so steps and jumps never leave the array
+WALL = 100
+PAD = 2
+
+# diagonal directions as (row step, column step)
+_DR = np.array([1, 1, -1, -1])
+_DC = np.array([1, -1, 1, -1])
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+# consecutive moves without a capture that make a game a draw
+DRAW_MOVES = 40
+
+
+def _uniform(state):
+    """
+    Advances the splitmix64 generator of every game and returns one random
+    float in [0, 1) per game.
+
+    Parameters:
+        state (np.ndarray): uint64 generator state of every game, advanced
+        in place
+
+    Returns: np.ndarray of float64
+    """
+    state += _GOLDEN
+    z = state.copy()
+    z ^= z >> np.uint64(30)
+    z *= _MIX1
+    z ^= z >> np.uint64(27)
+    z *= _MIX2
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0**-53
+
+
+class Simulator:
+    """
+    Plays random games on boards of one size as arrays.
+
+    A batch of positions is an int8 array of shape (games, side_len + 4,
+    side_len + 4) holding EMPTY, LIGHT_MAN, LIGHT_KING, DARK_MAN or
+    DARK_KING on every square, with two squares of WALL padding around the
+    board, plus an int8 array of whose turn it is (1 for light, -1 for
+    dark) and an array of moves since the last capture.
+
+    Attributes:
+    side_len (int): length of the board
+    """
+
+    def __init__(self, play_len=3):
+        """
+        Constructor
+
+        Parameters:
+            play_len (int): number of starting rows with pieces per player
+
+        Initializes a simulator for boards of side 2 * play_len + 2.
+        """
+        self.play_len = play_len
+        self.side_len = 2 * play_len + 2
+
+    def start_positions(self, count):
+        """
+        Returns count copies of the starting position.
+
+        Parameters:
+            count (int): number of games
+
+        Returns: tuple(np.ndarray, np.ndarray, np.ndarray) of boards, turns
+        and moves since capture
+        """
+        return self.encode([Checkers(self.play_len)] * count)
+
+    def encode(self, games):
+        """
+        Converts games into a batch of positions.
+
+        Parameters:
+            games (list[Checkers or BitboardCheckers]): games on a board of
+            this simulator's size
+
+        Returns: tuple(np.ndarray, np.ndarray, np.ndarray) of boards, turns
+        and moves since capture
+        """
+        side = self.side_len
+        encoded = {}
+        boards = np.full(
+            (len(games), side + 2 * PAD, side + 2 * PAD), WALL, np.int8
+        )
+        boards[:, PAD:-PAD, PAD:-PAD] = EMPTY
+        turns = np.empty(len(games), np.int8)
+        since_capture = np.empty(len(games), np.int16)
+        for i, game in enumerate(games):
+            if id(game) not in encoded:
+                if not isinstance(game, Checkers):
+                    game = game.to_checkers()
+                board = np.zeros((side, side), np.int8)
+                for row, col in game.board.pieces_white_set:
+                    king = game.board.board_grid[row][col].piece.king
+                    board[row, col] = LIGHT_KING if king else LIGHT_MAN
+                for row, col in game.board.pieces_black_set:
+                    king = game.board.board_grid[row][col].piece.king
+                    board[row, col] = DARK_KING if king else DARK_MAN
+                turn = 1 if game.board.turn == "LIGHT" else -1
+                encoded[id(game)] = (board, turn, game.moves_since_capture)
+            board, turns[i], since_capture[i] = encoded[id(game)]
+            boards[i, PAD:-PAD, PAD:-PAD] = board
+        return boards, turns, since_capture
+
+    def _moves(self, boards, turns):
+        """
+        Finds the steps and jumps of the side to move in every position.
+
+        Parameters:
+            boards (np.ndarray): positions
+            turns (np.ndarray): side to move in every position
+
+        Returns: tuple(np.ndarray, np.ndarray) of boolean arrays of shape
+        (4, games, side_len, side_len), True where the piece on a square
+        can step or jump in a direction
+        """
+        side = self.side_len
+        rel = boards * turns[:, None, None]
+        core = rel[:, PAD:-PAD, PAD:-PAD]
+        men = core == LIGHT_MAN
+        kings = core == LIGHT_KING
+        empty = rel == EMPTY
+        opp = (rel == DARK_MAN) | (rel == DARK_KING)
+        forward = turns[:, None, None] == 1
+        shape = (4,) + core.shape
+        steps = np.empty(shape, bool)
+        jumps = np.empty(shape, bool)
+        for d in range(4):
+            dr = _DR[d]
+            dc = _DC[d]
+            near = (
+                slice(None),
+                slice(PAD + dr, PAD + dr + side),
+                slice(PAD + dc, PAD + dc + side),
+            )
+            far = (
+                slice(None),
+                slice(PAD + 2 * dr, PAD + 2 * dr + side),
+                slice(PAD + 2 * dc, PAD + 2 * dc + side),
+            )
+            if dr == 1:
+                movers = kings | (men & forward)
+            else:
+                movers = kings | (men & ~forward)
+            steps[d] = movers & empty[near]
+            jumps[d] = movers & opp[near] & empty[far]
+        return steps, jumps
+
+    def play(self, boards, turns, since_capture, seeds):
+        """
+        Plays random games from a batch of positions until all of them are
+        decided. The arrays passed in may be changed.
+
+        Parameters:
+            boards (np.ndarray): positions, from start_positions or encode
+            turns (np.ndarray): side to move in every position
+            since_capture (np.ndarray): moves since capture of every position
+            seeds (list[int] or np.ndarray): seed of every game
+
+        Returns: tuple(np.ndarray, np.ndarray) of the winner of every game (1
+        light, -1 dark, 0 draw) and how many moves were played in it
+        """
+        count = len(boards)
+        winners = np.zeros(count, np.int8)
+        plies = np.zeros(count, np.int32)
+        side = self.side_len
+        last_row = side - 1
+        games = np.arange(count)
+        state = np.asarray(seeds, dtype=np.uint64).copy()
+        moved = np.zeros(count, np.int32)
+        # square of the piece that has to keep jumping, -1 at turn start
+        jumping = np.full(count, -1, np.int64)
+        while len(games):
+            steps, jumps = self._moves(boards, turns)
+            start = jumping < 0
+            if not start.all():
+                # in a multi-jump only the jumping piece may move
+                only = np.zeros((len(games), side * side), bool)
+                only[start] = True
+                only[~start, jumping[~start]] = True
+                jumps &= only.reshape(-1, side, side)
+                steps[:, ~start] = False
+            can_jump = jumps.any(axis=(0, 2, 3))
+            moves = np.where(can_jump[None, :, None, None], jumps, steps)
+            # decide games at the start of a turn like check_winner
+            own = moves.any(axis=(0, 2, 3))
+            other_steps, other_jumps = self._moves(boards, -turns)
+            other = other_steps.any(axis=(0, 2, 3)) | other_jumps.any(
+                axis=(0, 2, 3)
+            )
+            light = np.where(turns == 1, own, other)
+            dark = np.where(turns == 1, other, own)
+            winner = np.where(~light, -1, np.where(~dark, 1, 0))
+            done = start & (~light | ~dark | (since_capture >= DRAW_MOVES))
+            if done.any():
+                winners[games[done]] = winner[done]
+                plies[games[done]] = moved[done]
+                keep = ~done
+                games = games[keep]
+                boards = boards[keep]
+                turns = turns[keep]
+                since_capture = since_capture[keep]
+                state = state[keep]
+                moved = moved[keep]
+                jumping = jumping[keep]
+                moves = moves[:, keep]
+                can_jump = can_jump[keep]
+                if not len(games):
+                    break
+            n = len(games)
+            rows = np.arange(n)
+            # a random piece that can move, then a random direction
+            pieces = moves.any(axis=0).reshape(n, -1)
+            counts = pieces.sum(axis=1)
+            pick = (_uniform(state) * counts).astype(np.int64)
+            square = np.argmax(
+                np.cumsum(pieces, axis=1) > pick[:, None], axis=1
+            )
+            row = square // side
+            col = square % side
+            dirs = moves[:, rows, row, col]
+            pick = (_uniform(state) * dirs.sum(axis=0)).astype(np.int64)
+            d = np.argmax(np.cumsum(dirs, axis=0) > pick[None, :], axis=0)
+            dr = _DR[d]
+            dc = _DC[d]
+            # play the move
+            hop = 1 + can_jump
+            row2 = row + dr * hop
+            col2 = col + dc * hop
+            piece = boards[rows, row + PAD, col + PAD]
+            boards[rows, row + PAD, col + PAD] = EMPTY
+            taken = rows[can_jump]
+            boards[
+                taken,
+                row[can_jump] + dr[can_jump] + PAD,
+                col[can_jump] + dc[can_jump] + PAD,
+            ] = EMPTY
+            promoted = (np.abs(piece) == LIGHT_MAN) & (
+                (row2 == 0) | (row2 == last_row)
+            )
+            piece = np.where(promoted, piece * 2, piece)
+            boards[rows, row2 + PAD, col2 + PAD] = piece
+            since_capture = np.where(can_jump, 0, since_capture + 1)
+            # a capture without a promotion continues if it can jump again
+            again = np.zeros(n, bool)
+            check = can_jump & ~promoted
+            if check.any():
+                b = boards[check]
+                t = turns[check]
+                r = row2[check] + PAD
+                c = col2[check] + PAD
+                king = np.abs(piece[check]) == LIGHT_KING
+                idx = np.arange(len(b))
+                found = np.zeros(len(b), bool)
+                for k in range(4):
+                    mid = b[idx, r + _DR[k], c + _DC[k]] * t
+                    land = b[idx, r + 2 * _DR[k], c + 2 * _DC[k]]
+                    allowed = king | (t == _DR[k])
+                    found |= (
+                        allowed
+                        & ((mid == DARK_MAN) | (mid == DARK_KING))
+                        & (land == EMPTY)
+                    )
+                again[check] = found
+            jumping = np.where(again, row2 * side + col2, -1)
+            turns = np.where(again, turns, -turns).astype(np.int8)
+            moved += ~again
+        return winners, plies
+
+
+def simulate(count, play_len=3, seed=0, batch_size=4096):
+    """
+    Plays random games from the starting position, batch_size at a time.
+
+    Parameters:
+        count (int): number of games
+        play_len (int): number of starting rows with pieces per player
+        seed (int): game i is played with seed + i
+        batch_size (int): most games simulated at once
+
+    Returns: tuple(np.ndarray, np.ndarray) of the winner of every game (1
+    light, -1 dark, 0 draw) and how many moves it lasted
+    """
+    sim = Simulator(play_len)
+    winners = []
+    plies = []
+    for first in range(0, count, batch_size):
+        size = min(batch_size, count - first)
+        boards, turns, since_capture = sim.start_positions(size)
+        seeds = np.arange(seed + first, seed + first + size, dtype=np.uint64)
+        batch_winners, batch_plies = sim.play(
+            boards, turns, since_capture, seeds
+        )
+        winners.append(batch_winners)
+        plies.append(batch_plies)
+    return np.concatenate(winners), np.concatenate(plies)
+
+
+@click.command(name="checkers-sim")
+@click.option("-n", "--num-games", type=click.INT, default=10000)
+@click.option("--play_len", type=click.INT, default=3)
+@click.option("--seed", type=click.INT, default=0)
+@click.option("--batch-size", type=click.INT, default=4096)
+def sim_cmd(num_games, play_len, seed, batch_size):
+    """
+    Plays random games against each other with the batched simulator and
+    prints how they ended and how fast they were played.
+    """
+    start = time.time()
+    winners, plies = simulate(num_games, play_len, seed, batch_size)
+    seconds = time.time() - start
+    n = num_games
+    print(f"White won {100 * np.mean(winners == 1)}% of games")
+    print(f"Black won {100 * np.mean(winners == -1)}% of games")
+    print(f"Ties: {100 * np.mean(winners == 0)}%")
+    print(f"Average Moves per Game: {np.mean(plies)}")
+    print(f"{n / seconds:.0f} games/s, {3600 * n / seconds:.0f} games/hour")
+
+
+if __name__ == "__main__":
+    sim_cmd()
@@ -0,0 +1,150 @@
+"""
+Statistics about the searches of the bots in bot.py
+
+move, stats = bot.get_move(game, stats=True)
+# Returns the bot's move and a SearchStats of the search that found it
+print(stats.summary())
+# Prints the nodes, cutoffs, branching factor, time breakdown and the
+# principal variation
+total = SearchStats()
+total.merge(stats)
+# Adds the counters of one search to another, for example per game
+"""
+
+
+class SearchStats:
+    """
+    Counters collected while a Bot searches. Times are in seconds and only
+    cover the bot's own process, not the workers of a parallel root search
+    (their nodes are counted).
+
+    Attributes:
+    searches (int): number of searches (moves) added up
+    nodes (int): positions visited
+    leaves (int): positions evaluated with calculate_boardstate
+    expanded (int): positions whose moves were generated
+    children (int): moves generated at expanded positions
+    cutoffs (list[int]): alpha-beta cutoffs at every ply
+    researches (int): searches done again with a wider window, after a
+    null window or aspiration window of a PVS bot failed
+    depth (int): sum of the deepest finished search depth of every search
+    movegen_time (float): time spent generating moves
+    copy_time (float): time spent making and unmaking moves, and converting
+    games to BitboardCheckers
+    eval_time (float): time spent evaluating leaves
+    total_time (float): time spent in get_move
+    pv (list[Move]): principal variation of the last search
+    """
+
+    def __init__(self):
+        """
+        Constructor
+
+        Initializes all counters to zero.
+        """
+        self.searches = 0
+        self.nodes = 0
+        self.leaves = 0
+        self.expanded = 0
+        self.children = 0
+        self.cutoffs = []
+        self.researches = 0
+        self.depth = 0
+        self.movegen_time = 0.0
+        self.copy_time = 0.0
+        self.eval_time = 0.0
+        self.total_time = 0.0
+        self.pv = []
+
+    def add_cutoff(self, ply):
+        """
+        Counts an alpha-beta cutoff at a ply.
+
+        Parameters:
+            ply (int): how many moves deep into the search the cutoff was
+
+        Returns: None
+        """
+        while len(self.cutoffs) <= ply:
+            self.cutoffs.append(0)
+        self.cutoffs[ply] += 1
+
+    def branching(self):
+        """
+        Returns the average number of moves of the positions whose moves
+        were generated.
+
+        Returns: float
+        """
+        if self.expanded == 0:
+            return 0.0
+        return self.children / self.expanded
+
+    def merge(self, other):
+        """
+        Adds the counters of another SearchStats to these, keeping the
+        principal variation of the other one.
+
+        Parameters:
+            other (SearchStats): the statistics to add
+
+        Returns: None
+        """
+        self.searches += other.searches
+        self.nodes += other.nodes
+        self.leaves += other.leaves
+        self.expanded += other.expanded
+        self.children += other.children
+        for ply, count in enumerate(other.cutoffs):
+            while len(self.cutoffs) <= ply:
+                self.cutoffs.append(0)
+            self.cutoffs[ply] += count
+        self.researches += other.researches
+        self.depth += other.depth
+        self.movegen_time += other.movegen_time
+        self.copy_time += other.copy_time
+        self.eval_time += other.eval_time
+        self.total_time += other.total_time
+        self.pv = other.pv
+
+    def summary(self):
+        """
+        Returns a few lines describing the statistics.
+
+        Returns: str
+        """
+        searches = max(self.searches, 1)
+        total = self.total_time or 1.0
+        other = self.total_time - (
+            self.movegen_time + self.copy_time + self.eval_time
+        )
+        pv = " ".join(_move_str(move) for move in self.pv)
+        cutoffs = f"cutoffs by ply {self.cutoffs}"
+        if self.researches:
+            cutoffs += f", re-searches {self.researches}"
+        return "\n".join(
+            [
+                f"searches {self.searches}, nodes {self.nodes} "
+                f"({self.nodes / total:.0f}/s), leaves {self.leaves}, "
+                f"average depth {self.depth / searches:.1f}, "
+                f"branching factor {self.branching():.2f}",
+                cutoffs,
+                f"time {self.total_time:.3f}s: move generation "
+                f"{100 * self.movegen_time / total:.0f}%, make/unmake "
+                f"{100 * self.copy_time / total:.0f}%, evaluation "
+                f"{100 * self.eval_time / total:.0f}%, other "
+                f"{100 * other / total:.0f}%",
+                f"principal variation {pv}",
+            ]
+        )
+
+
+def _move_str(move):
+    """
+    Returns a move written as its squares joined by "-", or "x" for
+    captures.
+    """
+    sep = "x" if move.captured else "-"
+    return sep.join(
+        f"{row},{col}" for row, col in (move.start,) + move.path
+    )
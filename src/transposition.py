@@ -0,0 +1,177 @@
+"""
+Zobrist hashing and a transposition table for the minimax search in bot.py
+
+Every (square, color, king) combination gets a fixed random 64 bit key, and a
+position's hash is the XOR of the keys of all its pieces, XORed with
+TURN_KEY when it is dark's turn. Placing or removing a piece only needs one
+XOR, so Checkers keeps the hash up to date as pieces move.
+
+tt = TranspositionTable(16)
+# Creates a table using about 16 MB
+tt.store(key, 3, 5, EXACT, Move((5, 0), ((4, 1),), ()))
+# Stores a search result
+tt.probe(key)
+# Returns (depth, value, flag, move), or None if the key is not stored
+"""
+import random
+
+# bound types of stored values
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+TURN_KEY = random.Random("turn").getrandbits(64)
+
+_ZOBRIST_KEYS = {}
+
+
+def zobrist_keys(side_len):
+    """
+    Returns the Zobrist keys of every piece on a board of a given side length.
+    The keys are generated once per side length and shared by all games.
+
+    Parameters:
+        side_len (int): length of the board
+
+    Returns: dict{tuple(str, bool): list[int]} indexed by
+    row * side_len + column
+    """
+    keys = _ZOBRIST_KEYS.get(side_len)
+    if keys is None:
+        rng = random.Random(side_len)
+        keys = {}
+        for color in ("LIGHT", "DARK"):
+            for king in (False, True):
+                keys[(color, king)] = [
+                    rng.getrandbits(64) for _ in range(side_len * side_len)
+                ]
+        _ZOBRIST_KEYS[side_len] = keys
+    return keys
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results, indexed by Zobrist hash. Entries
+    are kept in parallel preallocated lists, so the table never grows.
+
+    An entry is replaced when the new result was searched at least as deep,
+    or when the stored one is left over from an earlier search (call
+    new_search before every search).
+
+    Attributes:
+    size (int): number of entries
+    generation (int): number of the current search
+    hits (int): probes that found their key
+    misses (int): probes that did not find their key
+    collisions (int): misses where the slot held a different key
+    """
+
+    # rough number of bytes used by one entry: six list slots plus the key,
+    # value and move objects they point to
+    ENTRY_BYTES = 128
+
+    def __init__(self, max_mb=16):
+        """
+        Constructor
+
+        Parameters:
+            max_mb (float): memory cap of the table in megabytes
+
+        Initializes an empty table with the largest power of two number of
+        entries that fits in max_mb.
+        """
+        entries = max(1, int(max_mb * 2**20) // self.ENTRY_BYTES)
+        self.size = 1 << (entries.bit_length() - 1)
+        self._mask = self.size - 1
+        self.generation = 0
+        self.clear()
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters.
+        """
+        self._keys = [None] * self.size
+        self._depths = [0] * self.size
+        self._values = [0] * self.size
+        self._flags = [EXACT] * self.size
+        self._moves = [None] * self.size
+        self._generations = [0] * self.size
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def new_search(self):
+        """
+        Marks every stored entry as coming from an earlier search, so they are
+        the first to be replaced.
+        """
+        self.generation += 1
+
+    def probe(self, key):
+        """
+        Looks up a position.
+
+        Parameters:
+            key (int): Zobrist hash of the position
+
+        Returns: tuple(int, int or float, int, move) of the stored depth,
+        value, bound type and best move, or None if the key is not stored
+        """
+        i = key & self._mask
+        stored = self._keys[i]
+        if stored == key:
+            self.hits += 1
+            return (
+                self._depths[i],
+                self._values[i],
+                self._flags[i],
+                self._moves[i],
+            )
+        self.misses += 1
+        if stored is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, value, flag, move):
+        """
+        Stores a search result, unless the slot holds a deeper result for
+        another position from the current search.
+
+        Parameters:
+            key (int): Zobrist hash of the position
+            depth (int): depth the position was searched to
+            value (int or float): value found by the search
+            flag (int): EXACT, LOWER or UPPER
+            move: best move found, or None
+
+        Returns: None
+        """
+        i = key & self._mask
+        if (
+            self._keys[i] is not None
+            and self._keys[i] != key
+            and self._generations[i] == self.generation
+            and self._depths[i] > depth
+        ):
+            return
+        self._keys[i] = key
+        self._depths[i] = depth
+        self._values[i] = value
+        self._flags[i] = flag
+        self._moves[i] = move
+        self._generations[i] = self.generation
+
+    def stats(self):
+        """
+        Returns the hit, miss and collision counters and how full the table
+        is.
+
+        Returns: dict{str: int or float}
+        """
+        used = self.size - self._keys.count(None)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "fill": used / self.size,
+        }